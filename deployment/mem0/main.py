@@ -1,16 +1,44 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import inspect
+import json
 import logging
 import os
+import queue
 import secrets
-from typing import Any, Dict, List, Optional
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from copy import copy, deepcopy
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+
+import pytz
 
 from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.security import APIKeyHeader
 from pydantic import BaseModel, Field
 
-from mem0 import Memory
+from mem0 import AsyncMemory, Memory
+from mem0.configs.base import MemoryConfig, MemoryItem
+from mem0.configs.prompts import get_update_memory_messages
+from mem0.embeddings.openai import OpenAIEmbedding
+from mem0.memory.main import _build_filters_and_metadata
+from mem0.memory.utils import extract_json, get_fact_retrieval_messages, parse_messages, remove_code_blocks
+from mem0.vector_stores.qdrant import Qdrant
+from qdrant_client import models
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -30,6 +58,11 @@ else:
 QDRANT_HOST = os.environ.get("QDRANT_HOST", "qdrant")
 QDRANT_PORT = int(os.environ.get("QDRANT_PORT", "6333"))
 QDRANT_COLLECTION_NAME = os.environ.get("QDRANT_COLLECTION_NAME", "memories")
+# Collection tuning applied at startup; 0 keeps the collection's current value
+QDRANT_HNSW_M = int(os.environ.get("QDRANT_HNSW_M", "0"))
+QDRANT_HNSW_EF_CONSTRUCT = int(os.environ.get("QDRANT_HNSW_EF_CONSTRUCT", "0"))
+QDRANT_SEARCH_EF = int(os.environ.get("QDRANT_SEARCH_EF", "0"))
+QDRANT_ON_DISK = os.environ.get("QDRANT_ON_DISK", "false").lower() == "true"
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL")
@@ -48,6 +81,43 @@ EMBEDDING_API_KEY = os.environ.get("EMBEDDING_API_KEY", OPENAI_API_KEY)
 EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")
 EMBEDDING_DIMS = int(os.environ.get("EMBEDDING_DIMS", "1536"))
 
+# Worker threads for concurrent vector store queries within one request (multi-scope / batch search)
+SEARCH_CONCURRENCY = int(os.environ.get("SEARCH_CONCURRENCY", "8"))
+# Maximum number of items accepted by batch endpoints
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "100"))
+# Worker threads for LLM-bound ingestion work (batch fact extraction / update decisions)
+INGEST_CONCURRENCY = int(os.environ.get("INGEST_CONCURRENCY", "4"))
+
+# Asynchronous add-memory jobs (POST /memories?async=true)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_QUEUE_MAXSIZE = int(os.environ.get("JOB_QUEUE_MAXSIZE", "1000"))
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", "3600"))
+
+# Page size bounds for GET /memories?limit=...
+LIST_DEFAULT_LIMIT = int(os.environ.get("LIST_DEFAULT_LIMIT", "50"))
+LIST_MAX_LIMIT = int(os.environ.get("LIST_MAX_LIMIT", "500"))
+
+# Embedding cache: in-memory LRU entries, and a SQLite file shared across restarts ("" disables either tier)
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH", os.path.join(os.path.dirname(HISTORY_DB_PATH), "embedding_cache.db")
+)
+EMBEDDING_CACHE_MAX_ROWS = int(os.environ.get("EMBEDDING_CACHE_MAX_ROWS", "500000"))
+
+# Fact-extraction results kept in memory, keyed by model, prompt and message hash (0 disables)
+EXTRACTION_CACHE_SIZE = int(os.environ.get("EXTRACTION_CACHE_SIZE", "2000"))
+
+# Seconds GET /stats results are reused for the same scope
+STATS_CACHE_TTL = float(os.environ.get("STATS_CACHE_TTL", "30"))
+
+# "sync": Memory on Starlette's threadpool; "async": AsyncMemory awaited on the event loop
+MEMORY_MODE = os.environ.get("MEMORY_MODE", "sync").lower()
+if MEMORY_MODE not in ("sync", "async"):
+    raise ValueError(f"MEMORY_MODE must be 'sync' or 'async', got {MEMORY_MODE!r}")
+ASYNC_MODE = MEMORY_MODE == "async"
+# Threads shared by AsyncMemory's blocking provider and vector store calls (asyncio.to_thread)
+ASYNC_MEMORY_THREADS = int(os.environ.get("ASYNC_MEMORY_THREADS", "64"))
+
 
 def _build_llm_config() -> dict:
     if LLM_PROVIDER == "ollama":
@@ -100,6 +170,7 @@ DEFAULT_CONFIG: Dict[str, Any] = {
             "port": QDRANT_PORT,
             "collection_name": QDRANT_COLLECTION_NAME,
             "embedding_model_dims": EMBEDDING_DIMS,
+            "on_disk": QDRANT_ON_DISK,
         },
     },
     "llm": _build_llm_config(),
@@ -109,8 +180,459 @@ DEFAULT_CONFIG: Dict[str, Any] = {
 if CUSTOM_FACT_EXTRACTION_PROMPT:
     DEFAULT_CONFIG["custom_fact_extraction_prompt"] = CUSTOM_FACT_EXTRACTION_PROMPT
 
-logging.info(f"Mem0 config: LLM={LLM_PROVIDER}/{OPENAI_MODEL} Embedder={EMBEDDER_PROVIDER}/{EMBEDDING_MODEL}")
-MEMORY_INSTANCE = Memory.from_config(DEFAULT_CONFIG)
+SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=SEARCH_CONCURRENCY, thread_name_prefix="mem0-search")
+INGEST_EXECUTOR = ThreadPoolExecutor(max_workers=INGEST_CONCURRENCY, thread_name_prefix="mem0-ingest")
+
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache: an in-memory LRU in front of an optional SQLite table.
+
+    Keys hash the model, the dimensions and the normalized text, so a model or dimension change never
+    returns stale vectors. The disk tier is trimmed oldest-first once it exceeds max_rows.
+    """
+
+    def __init__(self, size: int, path: str, max_rows: int):
+        self.size = size
+        self.max_rows = max_rows
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"memory_hit": 0, "disk_hit": 0, "miss": 0}
+        self._inserts = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._db.commit()
+
+    @staticmethod
+    def key(model: str, dims: Optional[int], text: str) -> str:
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return hashlib.sha256(f"{model}\n{dims}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._counts["memory_hit"] += 1
+                return vector
+            row = None
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._counts["miss"] += 1
+                return None
+            self._counts["disk_hit"] += 1
+            vector = array("f", row[0]).tolist()
+            self._remember(key, vector)
+            return vector
+
+    def set(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._remember(key, vector)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", (key, array("f", vector).tobytes())
+            )
+            self._inserts += 1
+            if self._inserts % 1000 == 0:
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM embeddings ORDER BY rowid LIMIT max(0, (SELECT count(*) FROM embeddings) - ?))",
+                    (self.max_rows,),
+                )
+            self._db.commit()
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        if self.size <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = sum(self._counts.values())
+            hits = self._counts["memory_hit"] + self._counts["disk_hit"]
+            return {
+                **self._counts,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+
+class CachedEmbedder:
+    """Wraps a mem0 embedder so every embed() call, including those inside Memory/AsyncMemory, hits the cache.
+
+    memory_action is not part of the key: the OpenAI and Ollama embedders this server builds ignore it.
+    """
+
+    def __init__(self, embedder: Any, cache: EmbeddingCache):
+        self.embedder = embedder
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.embedder, name)
+
+    def _key(self, text: str) -> str:
+        return self.cache.key(self.embedder.config.model, self.embedder.config.embedding_dims, text)
+
+    def embed(self, text: str, memory_action: Optional[str] = None) -> List[float]:
+        key = self._key(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.embedder.embed(text, memory_action)
+            self.cache.set(key, vector)
+        return vector
+
+    def embed_many(self, texts: List[str], embed_missing: Any) -> List[List[float]]:
+        """Look up every text, then embed only the misses with one embed_missing(texts) call."""
+        keys = [self._key(text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+        # One text per missing key: texts that normalize to the same key are embedded once
+        missing = {key: text for key, text, vector in zip(keys, texts, vectors) if vector is None}
+        if missing:
+            fresh = dict(zip(missing, embed_missing(list(missing.values()))))
+            for key, vector in fresh.items():
+                self.cache.set(key, vector)
+            vectors = [fresh[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        return vectors
+
+
+# User prompt prefix of mem0's fact-extraction call (default and custom prompts alike)
+EXTRACTION_INPUT_PREFIX = "Input:\n"
+
+
+class ExtractionCache:
+    """Size-bounded LRU of fact-extraction LLM responses.
+
+    Keys are (model, response format, system prompt hash, input hash).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: "OrderedDict[Tuple[str, str, str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hit": 0, "miss": 0}
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: Tuple[str, str, str, str]) -> Any:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self._counts["miss"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts["hit"] += 1
+            return response
+
+    def set(self, key: Tuple[str, str, str, str], response: Any) -> None:
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counts["hit"] + self._counts["miss"]
+            return {
+                **self._counts,
+                "hit_ratio": self._counts["hit"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+class CachedLLM:
+    """Wraps a mem0 LLM so fact-extraction calls are answered from ExtractionCache.
+
+    Only the extraction call is cached: a system prompt followed by one "Input:\n..." user message, as sent
+    by Memory._add_to_vector_store and _extract_facts. Update decisions depend on the current memories and
+    always go to the LLM. Requests with extraction_cache=false call the wrapped LLM directly
+    (_memory_without_extraction_cache), so they neither read nor write the cache.
+    """
+
+    def __init__(self, llm: Any, cache: ExtractionCache):
+        self.llm = llm
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def generate_response(self, messages: List[Dict[str, Any]], response_format: Any = None, **kwargs: Any) -> Any:
+        is_extraction = (
+            not kwargs.get("tools")
+            and len(messages) == 2
+            and messages[0].get("role") == "system"
+            and messages[1].get("role") == "user"
+            and str(messages[1].get("content", "")).startswith(EXTRACTION_INPUT_PREFIX)
+        )
+        if not is_extraction:
+            return self.llm.generate_response(messages=messages, response_format=response_format, **kwargs)
+        key = (
+            str(getattr(self.llm.config, "model", "")),
+            json.dumps(response_format, sort_keys=True),
+            self.cache.digest(messages[0]["content"]),
+            self.cache.digest(messages[1]["content"]),
+        )
+        response = self.cache.get(key)
+        if response is None:
+            response = self.llm.generate_response(messages=messages, response_format=response_format, **kwargs)
+            if response:
+                self.cache.set(key, response)
+        return response
+
+
+EXTRACTION_CACHE = ExtractionCache(EXTRACTION_CACHE_SIZE) if EXTRACTION_CACHE_SIZE > 0 else None
+
+EMBEDDING_CACHE = (
+    EmbeddingCache(EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ROWS)
+    if EMBEDDING_CACHE_SIZE > 0 or EMBEDDING_CACHE_PATH
+    else None
+)
+
+
+# ---- Qdrant collection tuning ----
+# Payload indexes keep filtered searches from scanning the whole HNSW graph; QDRANT_HNSW_* / QDRANT_SEARCH_EF /
+# QDRANT_ON_DISK tune the collection mem0 creates with defaults.
+
+# (collection, field) pairs with a payload index created by this process
+_PAYLOAD_INDEXES: set = set()
+
+# Payload indexes ensured at startup: identifiers for filtered search, timestamps for range counts and order_by
+PAYLOAD_INDEXES: Dict[str, models.PayloadSchemaType] = {
+    **{
+        field: models.PayloadSchemaType.KEYWORD
+        for field in ("user_id", "agent_id", "run_id", "actor_id", "source_app", "app_name", "categories")
+    },
+    "created_at": models.PayloadSchemaType.DATETIME,
+    "updated_at": models.PayloadSchemaType.DATETIME,
+}
+
+
+def _ensure_payload_index(store: Qdrant, field: str, schema: models.PayloadSchemaType) -> None:
+    """Create a payload index once per process. Remote Qdrant needs one on every order_by key."""
+    key = (store.collection_name, field)
+    if store.is_local or key in _PAYLOAD_INDEXES:
+        return
+    try:
+        store.client.create_payload_index(collection_name=store.collection_name, field_name=field, field_schema=schema)
+    except Exception as e:
+        logging.warning(f"Could not create payload index on {field}: {e}")
+        return
+    _PAYLOAD_INDEXES.add(key)
+
+
+def _update_collection_params(store: Qdrant) -> None:
+    """Apply QDRANT_HNSW_M / QDRANT_HNSW_EF_CONSTRUCT / QDRANT_ON_DISK to an existing collection if they differ."""
+    config = store.client.get_collection(store.collection_name).config
+    hnsw = {}
+    if QDRANT_HNSW_M and config.hnsw_config.m != QDRANT_HNSW_M:
+        hnsw["m"] = QDRANT_HNSW_M
+    if QDRANT_HNSW_EF_CONSTRUCT and config.hnsw_config.ef_construct != QDRANT_HNSW_EF_CONSTRUCT:
+        hnsw["ef_construct"] = QDRANT_HNSW_EF_CONSTRUCT
+    vectors = config.params.vectors
+    # mem0 creates a single unnamed vector; the "" key addresses it in updates
+    on_disk = isinstance(vectors, models.VectorParams) and QDRANT_ON_DISK and not vectors.on_disk
+    if not hnsw and not on_disk:
+        return
+    store.client.update_collection(
+        collection_name=store.collection_name,
+        hnsw_config=models.HnswConfigDiff(**hnsw) if hnsw else None,
+        vectors_config={"": models.VectorParamsDiff(on_disk=True)} if on_disk else None,
+    )
+    logging.info(f"Updated Qdrant collection {store.collection_name}: hnsw={hnsw} on_disk={on_disk}")
+
+
+def _search_with_ef(store: Qdrant) -> Callable[..., list]:
+    """Qdrant.search with search_params.hnsw_ef set to QDRANT_SEARCH_EF."""
+    search_params = models.SearchParams(hnsw_ef=QDRANT_SEARCH_EF)
+
+    def search(query: str, vectors: list, limit: int = 5, filters: dict = None) -> list:
+        return store.client.query_points(
+            collection_name=store.collection_name,
+            query=vectors,
+            query_filter=store._create_filter(filters) if filters else None,
+            limit=limit,
+            search_params=search_params,
+        ).points
+
+    return search
+
+
+def _tune_vector_store(memory: Any) -> None:
+    """Ensure payload indexes and collection tuning on the memory's Qdrant store (again after reset recreates it)."""
+    store = memory.vector_store
+    if not isinstance(store, Qdrant):
+        return
+    for field, schema in PAYLOAD_INDEXES.items():
+        _PAYLOAD_INDEXES.discard((store.collection_name, field))
+        _ensure_payload_index(store, field, schema)
+    if not store.is_local:
+        try:
+            _update_collection_params(store)
+        except Exception as e:
+            logging.warning(f"Could not update Qdrant collection {store.collection_name}: {e}")
+    if QDRANT_SEARCH_EF:
+        store.search = _search_with_ef(store)
+
+
+def _create_memory_instance(config: Dict[str, Any]) -> Any:
+    memory = AsyncMemory(MemoryConfig(**config)) if ASYNC_MODE else Memory.from_config(config)
+    if EMBEDDING_CACHE is not None:
+        memory.embedding_model = CachedEmbedder(memory.embedding_model, EMBEDDING_CACHE)
+    if EXTRACTION_CACHE is not None:
+        memory.llm = CachedLLM(memory.llm, EXTRACTION_CACHE)
+    return memory
+
+
+def _memory_without_extraction_cache() -> Any:
+    """MEMORY_INSTANCE with the LLM that CachedLLM wraps: its fact extractions skip ExtractionCache entirely.
+
+    A shallow copy, so stores, embedder and history are shared. mem0 runs extraction on its own thread pool,
+    which is why the bypass travels with the instance rather than with the calling thread or context.
+    """
+    memory = copy(MEMORY_INSTANCE)
+    if isinstance(memory.llm, CachedLLM):
+        memory.llm = memory.llm.llm
+    return memory
+
+
+async def _memory_call(method: str, *args: Any, memory: Any = None, **kwargs: Any) -> Any:
+    """Call a MEMORY_INSTANCE (or `memory`) method from a route: awaited on AsyncMemory, on the threadpool
+    for Memory."""
+    func = getattr(memory if memory is not None else MEMORY_INSTANCE, method)
+    if ASYNC_MODE:
+        return await func(*args, **kwargs)
+    return await run_in_threadpool(func, *args, **kwargs)
+
+
+def _resolve(result: Any) -> Any:
+    """Finish an AsyncMemory coroutine started from a worker thread (jobs, batch ingestion)."""
+    if inspect.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+logging.info(
+    f"Mem0 config: mode={MEMORY_MODE} LLM={LLM_PROVIDER}/{OPENAI_MODEL} "
+    f"Embedder={EMBEDDER_PROVIDER}/{EMBEDDING_MODEL}"
+)
+MEMORY_INSTANCE = _create_memory_instance(DEFAULT_CONFIG)
+
+
+class JobQueue:
+    """Bounded queue of background jobs processed by a fixed pool of worker threads.
+
+    Finished jobs are kept for JOB_RESULT_TTL seconds so clients can poll their status.
+    """
+
+    def __init__(self, workers: int, maxsize: int, result_ttl: float):
+        self.result_ttl = result_ttl
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=maxsize)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._counts = {"succeeded": 0, "failed": 0, "rejected": 0}
+        self._wait = [0.0, 0]
+        self._processing = [0.0, 0]
+        self._running = 0
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"mem0-job-{i}", daemon=True).start()
+
+    def submit(self, kind: str, fn: Any) -> Optional[Dict[str, Any]]:
+        """Queue fn for execution; returns the job record, or None if the queue is full."""
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        with self._lock:
+            self._prune()
+            try:
+                self._queue.put_nowait((job["id"], fn))
+            except queue.Full:
+                self._counts["rejected"] += 1
+                return None
+            self._jobs[job["id"]] = job
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _work(self) -> None:
+        while True:
+            job_id, fn = self._queue.get()
+            with self._lock:
+                job = self._jobs[job_id]
+                job["status"] = "running"
+                job["started_at"] = time.time()
+                self._running += 1
+                self._wait[0] += job["started_at"] - job["created_at"]
+                self._wait[1] += 1
+            try:
+                result, error, status = fn(), None, "succeeded"
+            except Exception as e:
+                logging.exception("Error in background job %s:", job_id)
+                result, error, status = None, str(e), "failed"
+            with self._lock:
+                job.update(status=status, result=result, error=error, finished_at=time.time())
+                self._running -= 1
+                self._counts[status] += 1
+                self._processing[0] += job["finished_at"] - job["started_at"]
+                self._processing[1] += 1
+            self._queue.task_done()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "running": self._running,
+                **self._counts,
+                "wait_seconds_sum": self._wait[0],
+                "wait_seconds_count": self._wait[1],
+                "processing_seconds_sum": self._processing[0],
+                "processing_seconds_count": self._processing[1],
+            }
+
+
+JOB_QUEUE = JobQueue(workers=JOB_WORKERS, maxsize=JOB_QUEUE_MAXSIZE, result_ttl=JOB_RESULT_TTL)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # AsyncMemory offloads blocking provider / vector store calls with asyncio.to_thread, which uses the
+    # loop's default executor (min(32, cpu + 4) threads unless replaced).
+    if ASYNC_MODE:
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=ASYNC_MEMORY_THREADS, thread_name_prefix="mem0-async")
+        )
+    await run_in_threadpool(_tune_vector_store, MEMORY_INSTANCE)
+    yield
+
 
 app = FastAPI(
     title="Mem0 REST APIs",
@@ -121,6 +643,7 @@ app = FastAPI(
         "the `X-API-Key` header for authentication."
     ),
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 ALLOWED_ORIGINS = os.environ.get("CORS_ORIGINS", "*").split(",")
@@ -132,6 +655,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
 api_router = APIRouter(prefix="/api/v1")
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
@@ -177,95 +701,911 @@ class SearchRequest(BaseModel):
     threshold: Optional[float] = Field(None, description="Minimum similarity score for results.")
 
 
+class VectorSearchRequest(BaseModel):
+    vector: List[float] = Field(..., description="Precomputed query embedding.")
+    embedding_model: Optional[str] = Field(
+        None, description="Model that produced the vector; rejected if it differs from the server's embedder."
+    )
+    user_id: Optional[str] = None
+    run_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    filters: Optional[Dict[str, Any]] = None
+    top_k: Optional[int] = Field(None, description="Maximum number of results to return.")
+    threshold: Optional[float] = Field(None, description="Minimum similarity score for results.")
+
+
+class SearchScope(BaseModel):
+    name: str = Field(..., description="Key under which this scope's results are returned.")
+    user_id: Optional[str] = None
+    run_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    filters: Optional[Dict[str, Any]] = None
+    top_k: Optional[int] = Field(None, description="Maximum number of results to return.")
+    threshold: Optional[float] = Field(None, description="Minimum similarity score for results.")
+
+
+class MultiSearchRequest(BaseModel):
+    query: Optional[str] = Field(None, description="Search query; embedded once for all scopes.")
+    vector: Optional[List[float]] = Field(None, description="Precomputed query embedding (skips the embedder).")
+    embedding_model: Optional[str] = Field(None, description="Model that produced the vector.")
+    scopes: List[SearchScope] = Field(..., min_length=1, description="Filter scopes to search.")
+
+
+class MemoryBatchCreate(BaseModel):
+    items: List[MemoryCreate] = Field(..., min_length=1, description="Memories to create; results keep this order.")
+
+
+class BatchSearchRequest(BaseModel):
+    searches: List[SearchRequest] = Field(..., min_length=1, description="Searches to run; results keep this order.")
+
+
+# Payload keys promoted to top-level fields, mirroring Memory._search_vector_store
+PROMOTED_PAYLOAD_KEYS = ("user_id", "agent_id", "run_id", "actor_id", "role")
+CORE_PAYLOAD_KEYS = {"data", "hash", "created_at", "updated_at", "id", *PROMOTED_PAYLOAD_KEYS}
+
+
+def _format_memory(mem: Any) -> Dict[str, Any]:
+    """Convert a vector store record into the same dict shape Memory.search returns."""
+    payload = mem.payload or {}
+    item = MemoryItem(
+        id=mem.id,
+        memory=payload.get("data", ""),
+        hash=payload.get("hash"),
+        created_at=payload.get("created_at"),
+        updated_at=payload.get("updated_at"),
+        score=getattr(mem, "score", None),
+    ).model_dump()
+    for key in PROMOTED_PAYLOAD_KEYS:
+        if key in payload:
+            item[key] = payload[key]
+    metadata = {k: v for k, v in payload.items() if k not in CORE_PAYLOAD_KEYS}
+    if metadata:
+        item["metadata"] = metadata
+    return item
+
+
 @api_router.post("/configure", summary="Configure Mem0")
 def set_config(config: Dict[str, Any], _api_key: Optional[str] = Depends(verify_api_key)):
     global MEMORY_INSTANCE
-    MEMORY_INSTANCE = Memory.from_config(config)
+    MEMORY_INSTANCE = _create_memory_instance(config)
+    _tune_vector_store(MEMORY_INSTANCE)
     return {"message": "Configuration set successfully"}
 
 
 @api_router.post("/memories", summary="Create memories")
-def add_memory(memory_create: MemoryCreate, _api_key: Optional[str] = Depends(verify_api_key)):
+async def add_memory(
+    memory_create: MemoryCreate,
+    run_async: bool = Query(False, alias="async", description="Queue the job and return 202 with a job id."),
+    extraction_cache: bool = Query(
+        True, description="Set to false to run fact extraction without reading or writing the extraction cache."
+    ),
+    _api_key: Optional[str] = Depends(verify_api_key),
+):
     if not any([memory_create.user_id, memory_create.agent_id, memory_create.run_id]):
         raise HTTPException(status_code=400, detail="At least one identifier (user_id, agent_id, run_id) is required.")
     params = {k: v for k, v in memory_create.model_dump().items() if v is not None and k != "messages"}
+    memory = MEMORY_INSTANCE if extraction_cache else _memory_without_extraction_cache()
+    if run_async:
+        messages = [m.model_dump() for m in memory_create.messages]
+        job = JOB_QUEUE.submit("add_memory", lambda: _resolve(memory.add(messages=messages, **params)))
+        if job is None:
+            raise HTTPException(status_code=503, detail="Job queue is full, retry later.", headers={"Retry-After": "1"})
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job["id"], "status": job["status"], "status_url": f"/api/v1/jobs/{job['id']}"},
+        )
     try:
-        response = MEMORY_INSTANCE.add(messages=[m.model_dump() for m in memory_create.messages], **params)
+        response = await _memory_call(
+            "add", messages=[m.model_dump() for m in memory_create.messages], memory=memory, **params
+        )
         return JSONResponse(content=response)
     except Exception as e:
         logging.exception("Error in add_memory:")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ---- Batch ingestion ----
+# Mirrors Memory._add_to_vector_store, but splits it into stages that can be shared across items:
+# fact extraction once per distinct input, one embedder call for every fact, one vector store insert
+# and one history transaction per item for new memories.
+
+
+def _parse_llm_json(response: Optional[str]) -> Dict[str, Any]:
+    response = remove_code_blocks(response or "")
+    if not response.strip():
+        return {}
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        return json.loads(extract_json(response))
+
+
+def _extract_facts(messages: List[Dict[str, Any]], metadata: Dict[str, Any], llm: Any) -> List[str]:
+    """Fact-extraction LLM call, built the same way as Memory._add_to_vector_store (including the JSON prompt fix)."""
+    parsed_messages = parse_messages(messages)
+    custom_prompt = MEMORY_INSTANCE.config.custom_fact_extraction_prompt
+    if custom_prompt:
+        system_prompt = custom_prompt
+        if "json" not in custom_prompt.lower():
+            system_prompt += "\n\nPlease respond in JSON format with a 'facts' array."
+        user_prompt = f"Input:\n{parsed_messages}"
+    else:
+        is_agent_memory = MEMORY_INSTANCE._should_use_agent_memory_extraction(messages, metadata)
+        system_prompt, user_prompt = get_fact_retrieval_messages(parsed_messages, is_agent_memory)
+    response = llm.generate_response(
+        messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+        response_format={"type": "json_object"},
+    )
+    try:
+        return _parse_llm_json(response).get("facts", [])
+    except Exception as e:
+        logging.error(f"Error parsing extracted facts: {e}")
+        return []
+
+
+def _bulk_add_history(rows: List[Tuple[Any, ...]]) -> None:
+    """Insert many history rows in one SQLite transaction."""
+    db = MEMORY_INSTANCE.db
+    with db._lock:
+        try:
+            db.connection.execute("BEGIN")
+            db.connection.executemany(
+                """
+                INSERT INTO history (
+                    id, memory_id, old_memory, new_memory, event,
+                    created_at, updated_at, is_deleted, actor_id, role
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            db.connection.execute("COMMIT")
+        except Exception:
+            db.connection.execute("ROLLBACK")
+            raise
+
+
+def _bulk_create_memories(entries: List[Tuple[str, Dict[str, Any]]], embeddings: Dict[str, List[float]]) -> List[str]:
+    """Create many memories with one vector store insert (payloads match Memory._create_memory)."""
+    created_at = datetime.now(pytz.timezone("US/Pacific")).isoformat()
+    ids, vectors, payloads, history = [], [], [], []
+    for text, metadata in entries:
+        memory_id = str(uuid.uuid4())
+        payload = {**metadata, "data": text, "hash": hashlib.md5(text.encode()).hexdigest(), "created_at": created_at}
+        ids.append(memory_id)
+        vectors.append(embeddings[text])
+        payloads.append(payload)
+        history.append(
+            (str(uuid.uuid4()), memory_id, None, text, "ADD", created_at, None, 0, payload.get("actor_id"), payload.get("role"))
+        )
+    if ids:
+        MEMORY_INSTANCE.vector_store.insert(vectors=vectors, ids=ids, payloads=payloads)
+        _bulk_add_history(history)
+    return ids
+
+
+def _ingest_raw(messages: List[Dict[str, Any]], metadata: Dict[str, Any], embeddings: Dict[str, List[float]]) -> List[Dict[str, Any]]:
+    """infer=False: store every non-system message as a memory."""
+    entries, results = [], []
+    for message in messages:
+        if message.get("role") == "system":
+            continue
+        per_msg_meta = deepcopy(metadata)
+        per_msg_meta["role"] = message["role"]
+        actor_name = message.get("name")
+        if actor_name:
+            per_msg_meta["actor_id"] = actor_name
+        entries.append((message["content"], per_msg_meta))
+        results.append({"memory": message["content"], "event": "ADD", "actor_id": actor_name, "role": message["role"]})
+    for memory_id, result in zip(_bulk_create_memories(entries, embeddings), results):
+        result["id"] = memory_id
+    return results
+
+
+def _ingest_facts(
+    facts: List[str], metadata: Dict[str, Any], filters: Dict[str, Any], embeddings: Dict[str, List[float]]
+) -> List[Dict[str, Any]]:
+    """infer=True: update decision against existing memories, then apply the resulting events."""
+    if not facts:
+        return []
+    search_filters = {key: filters[key] for key in ("user_id", "agent_id", "run_id") if filters.get(key)}
+    lookups = SEARCH_EXECUTOR.map(
+        lambda fact: MEMORY_INSTANCE.vector_store.search(
+            query=fact, vectors=embeddings[fact], limit=5, filters=search_filters
+        ),
+        facts,
+    )
+    old_memory = {}
+    for existing in lookups:
+        for mem in existing:
+            old_memory[mem.id] = mem.payload.get("data", "")
+    # Integer ids guard against UUID hallucinations, as in Memory._add_to_vector_store
+    temp_uuid_mapping = {str(idx): memory_id for idx, memory_id in enumerate(old_memory)}
+    retrieved_old_memory = [{"id": str(idx), "text": text} for idx, text in enumerate(old_memory.values())]
+
+    prompt = get_update_memory_messages(
+        retrieved_old_memory, facts, MEMORY_INSTANCE.config.custom_update_memory_prompt
+    )
+    try:
+        response = MEMORY_INSTANCE.llm.generate_response(
+            messages=[{"role": "user", "content": prompt}], response_format={"type": "json_object"}
+        )
+        actions = _parse_llm_json(response).get("memory", [])
+    except Exception as e:
+        logging.error(f"Error in new memory actions response: {e}")
+        actions = []
+
+    additions: List[Tuple[str, Dict[str, Any]]] = []
+    results: List[Dict[str, Any]] = []
+    for action in actions:
+        text, event = action.get("text"), action.get("event")
+        if not text:
+            continue
+        memory_id = temp_uuid_mapping.get(action.get("id"))
+        if event == "ADD":
+            additions.append((text, deepcopy(metadata)))
+        elif event == "UPDATE" and not memory_id:
+            # Same fallback as the patched Memory.add (patches/apply_memory_fixes.py): keep the fact
+            logging.warning(f"Memory ID '{action.get('id')}' not found in existing memories, treating UPDATE as ADD")
+            additions.append((text, deepcopy(metadata)))
+        elif event == "UPDATE":
+            _resolve(MEMORY_INSTANCE._update_memory(
+                memory_id=memory_id, data=text, existing_embeddings=embeddings, metadata=deepcopy(metadata)
+            ))
+            results.append({"id": memory_id, "memory": text, "event": event, "previous_memory": action.get("old_memory")})
+        elif event == "DELETE" and not memory_id:
+            logging.warning(f"Memory ID '{action.get('id')}' not found in existing memories, skipping DELETE")
+        elif event == "DELETE":
+            _resolve(MEMORY_INSTANCE._delete_memory(memory_id=memory_id))
+            results.append({"id": memory_id, "memory": text, "event": event})
+        elif event == "NONE" and memory_id and (metadata.get("agent_id") or metadata.get("run_id")):
+            # Content unchanged, but attach the new session identifiers (same as Memory.add)
+            existing_memory = MEMORY_INSTANCE.vector_store.get(vector_id=memory_id)
+            if existing_memory is None:
+                continue
+            payload = deepcopy(existing_memory.payload)
+            for key in ("agent_id", "run_id"):
+                if metadata.get(key):
+                    payload[key] = metadata[key]
+            payload["updated_at"] = datetime.now(pytz.timezone("US/Pacific")).isoformat()
+            MEMORY_INSTANCE.vector_store.update(vector_id=memory_id, vector=None, payload=payload)
+
+    # The update step may rephrase facts; embed any new wording in one more call
+    missing = list(dict.fromkeys(text for text, _ in additions if text not in embeddings))
+    if missing:
+        embeddings.update(zip(missing, _embed_texts(missing, "add")))
+    for memory_id, (text, _) in zip(_bulk_create_memories(additions, embeddings), additions):
+        results.append({"id": memory_id, "memory": text, "event": "ADD"})
+    return results
+
+
+@api_router.post("/memories/batch", summary="Create memories for many message lists")
+def add_memories_batch(
+    batch_req: MemoryBatchCreate,
+    extraction_cache: bool = Query(
+        True, description="Set to false to run fact extraction without reading or writing the extraction cache."
+    ),
+    _api_key: Optional[str] = Depends(verify_api_key),
+):
+    """Batched version of POST /memories.
+
+    Distinct message lists are sent to fact extraction once each (concurrently), every extracted fact is
+    embedded in a single embedder request, and new memories are written with bulk upserts. Items sharing
+    the same user/agent/run scope are processed in order so later items see earlier writes; different
+    scopes run concurrently. Items using memory_type or prompt go through Memory.add unchanged.
+
+    Returns per-item {"results": [...]} or {"error": ...} in request order.
+    """
+    if len(batch_req.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} items per batch.")
+
+    memory = MEMORY_INSTANCE if extraction_cache else _memory_without_extraction_cache()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(batch_req.items)
+    prepared: Dict[int, Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any], bool]] = {}
+    passthrough: Dict[int, MemoryCreate] = {}
+    for index, item in enumerate(batch_req.items):
+        if not any([item.user_id, item.agent_id, item.run_id]):
+            results[index] = {"error": "At least one identifier (user_id, agent_id, run_id) is required."}
+        elif item.memory_type or item.prompt:
+            passthrough[index] = item
+        else:
+            metadata, filters = _build_filters_and_metadata(
+                user_id=item.user_id, agent_id=item.agent_id, run_id=item.run_id, input_metadata=item.metadata
+            )
+            messages = [m.model_dump() for m in item.messages]
+            prepared[index] = (messages, metadata, filters, item.infer is not False)
+
+    try:
+        # Stage 1: fact extraction, once per distinct (messages, extraction mode)
+        extraction_inputs: Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Any]]] = {}
+        extraction_keys: Dict[int, str] = {}
+        for index, (messages, metadata, _, infer) in prepared.items():
+            if infer:
+                key = json.dumps(
+                    [messages, MEMORY_INSTANCE._should_use_agent_memory_extraction(messages, metadata)],
+                    sort_keys=True, ensure_ascii=False,
+                )
+                extraction_inputs.setdefault(key, (messages, metadata))
+                extraction_keys[index] = key
+        extraction_futures = {
+            key: INGEST_EXECUTOR.submit(_extract_facts, messages, metadata, memory.llm)
+            for key, (messages, metadata) in extraction_inputs.items()
+        }
+        facts = {index: extraction_futures[key].result() for index, key in extraction_keys.items()}
+
+        # Stage 2: one embedder call for every fact and raw message in the batch
+        texts: List[str] = []
+        for index, (messages, _, _, infer) in prepared.items():
+            if infer:
+                texts.extend(facts[index])
+            else:
+                texts.extend(m["content"] for m in messages if m.get("role") != "system")
+        texts = list(dict.fromkeys(texts))
+        embeddings = dict(zip(texts, _embed_texts(texts, "add"))) if texts else {}
+    except Exception as e:
+        logging.exception("Error in add_memories_batch:")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Stage 3: update decisions and writes, sequential within a scope, concurrent across scopes
+    def run_scope(indexes: List[int]) -> None:
+        for index in indexes:
+            messages, metadata, filters, infer = prepared[index]
+            try:
+                if infer:
+                    memories = _ingest_facts(facts[index], metadata, filters, dict(embeddings))
+                else:
+                    memories = _ingest_raw(messages, metadata, embeddings)
+                results[index] = {"results": memories}
+            except Exception as e:
+                logging.exception("Error in add_memories_batch item %d:", index)
+                results[index] = {"error": str(e)}
+
+    def run_passthrough(index: int, item: MemoryCreate) -> None:
+        params = {k: v for k, v in item.model_dump().items() if v is not None and k != "messages"}
+        try:
+            results[index] = _resolve(memory.add(messages=[m.model_dump() for m in item.messages], **params))
+        except Exception as e:
+            logging.exception("Error in add_memories_batch item %d:", index)
+            results[index] = {"error": str(e)}
+
+    scopes: Dict[Tuple[Any, ...], List[int]] = {}
+    for index, item in enumerate(batch_req.items):
+        if index in prepared:
+            scopes.setdefault((item.user_id, item.agent_id, item.run_id), []).append(index)
+    futures = [INGEST_EXECUTOR.submit(run_scope, indexes) for indexes in scopes.values()]
+    futures.extend(INGEST_EXECUTOR.submit(run_passthrough, index, item) for index, item in passthrough.items())
+    for future in futures:
+        future.result()
+    return {"results": results}
+
+
+@api_router.get("/jobs/{job_id}", summary="Get background job status")
+def get_job(job_id: str, _api_key: Optional[str] = Depends(verify_api_key)):
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return job
+
+
+# ---- Paginated listing ----
+# GET /memories with limit/cursor/app/category/sort_by pages through Qdrant with scroll and payload filters
+# instead of returning every memory for the identifier.
+
+# Metadata keys the WebUI reads the app name from
+APP_PAYLOAD_KEYS = ("source_app", "app_name")
+
+
+def _qdrant_store() -> Qdrant:
+    store = MEMORY_INSTANCE.vector_store
+    if not isinstance(store, Qdrant):
+        raise HTTPException(status_code=501, detail="This endpoint requires the Qdrant vector store.")
+    return store
+
+
+def _encode_cursor(state: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: Optional[str]) -> Dict[str, Any]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        state = None
+    if not isinstance(state, dict) or state.get("sort") != sort_by:
+        raise HTTPException(status_code=400, detail="Invalid cursor for this listing.")
+    return state
+
+
+def _listing_filter(
+    ids: Dict[str, str], apps: Optional[List[str]], categories: Optional[List[str]]
+) -> models.Filter:
+    must: List[Any] = [models.FieldCondition(key=k, match=models.MatchValue(value=v)) for k, v in ids.items()]
+    if apps:
+        must.append(models.Filter(should=[
+            models.FieldCondition(key=key, match=models.MatchAny(any=apps)) for key in APP_PAYLOAD_KEYS
+        ]))
+    if categories:
+        must.append(models.FieldCondition(key="categories", match=models.MatchAny(any=categories)))
+    return models.Filter(must=must)
+
+
+def _scroll_sorted(
+    store: Qdrant, scroll_filter: models.Filter, sort_by: str, descending: bool, limit: int, state: Dict[str, Any]
+) -> Tuple[List[Any], Optional[Dict[str, Any]]]:
+    """Page ordered by a timestamp payload field.
+
+    Qdrant's order_by cannot resume from a point id, so the cursor keeps the last timestamp plus the ids
+    already returned with it. Memories that were never updated have no updated_at and are not returned by
+    order_by on it; sort_by=updated_at lists them afterwards by created_at.
+    """
+    phases: List[Tuple[str, Optional[Any]]] = [(sort_by, None)]
+    if sort_by == "updated_at":
+        phases.append(("created_at", models.IsEmptyCondition(is_empty=models.PayloadField(key="updated_at"))))
+    direction = models.Direction.DESC if descending else models.Direction.ASC
+    phase, start_from, skip = state.get("phase", 0), state.get("from"), list(state.get("skip", []))
+
+    points: List[Any] = []
+    while phase < len(phases) and len(points) < limit:
+        key, condition = phases[phase]
+        _ensure_payload_index(store, key, models.PayloadSchemaType.DATETIME)
+        wanted = limit - len(points)
+        page, _ = store.client.scroll(
+            collection_name=store.collection_name,
+            scroll_filter=models.Filter(
+                must=list(scroll_filter.must) + ([condition] if condition else []),
+                must_not=[models.HasIdCondition(has_id=skip)] if skip else None,
+            ),
+            limit=wanted,
+            order_by=models.OrderBy(
+                key=key,
+                direction=direction,
+                start_from=datetime.fromisoformat(start_from) if start_from else None,
+            ),
+            with_payload=True,
+            with_vectors=False,
+        )
+        for point in page:
+            value = point.payload.get(key)
+            if value != start_from:
+                start_from, skip = value, []
+            skip.append(str(point.id))
+        points.extend(page)
+        if len(page) < wanted:
+            phase, start_from, skip = phase + 1, None, []
+
+    if phase >= len(phases):
+        return points, None
+    return points, {"sort": sort_by, "phase": phase, "from": start_from, "skip": skip}
+
+
+def _list_memories_page(
+    ids: Dict[str, str],
+    limit: int,
+    state: Dict[str, Any],
+    apps: Optional[List[str]],
+    categories: Optional[List[str]],
+    sort_by: Optional[str],
+    descending: bool,
+) -> Dict[str, Any]:
+    store = _qdrant_store()
+    scroll_filter = _listing_filter(ids, apps, categories)
+    if sort_by:
+        points, next_state = _scroll_sorted(store, scroll_filter, sort_by, descending, limit, state)
+    else:
+        # Point id order: Qdrant resumes the scroll from next_page_offset directly
+        points, next_offset = store.client.scroll(
+            collection_name=store.collection_name,
+            scroll_filter=scroll_filter,
+            limit=limit,
+            offset=state.get("offset"),
+            with_payload=True,
+            with_vectors=False,
+        )
+        next_state = {"sort": None, "offset": next_offset} if next_offset is not None else None
+    # Exact counts scan every matching point, so only the first page counts; later pages echo it from the cursor
+    total = state.get("total")
+    if total is None:
+        total = store.client.count(collection_name=store.collection_name, count_filter=scroll_filter, exact=True).count
+    if next_state:
+        next_state["total"] = total
+    results = []
+    for point in points:
+        item = _format_memory(point)
+        item.pop("score", None)
+        results.append(item)
+    return {
+        "results": results,
+        "next_cursor": _encode_cursor(next_state) if next_state else None,
+        "total": total,
+    }
+
+
 @api_router.get("/memories", summary="Get memories")
-def get_all_memories(
+async def get_all_memories(
     user_id: Optional[str] = None,
     run_id: Optional[str] = None,
     agent_id: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT, description="Page size; enables cursor pagination."),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page."),
+    app: Optional[List[str]] = Query(None, description="Only memories whose source_app / app_name is one of these."),
+    category: Optional[List[str]] = Query(None, description="Only memories with at least one of these categories."),
+    sort_by: Optional[Literal["created_at", "updated_at"]] = Query(None, description="Timestamp to order by."),
+    order: Literal["asc", "desc"] = Query("desc"),
     _api_key: Optional[str] = Depends(verify_api_key),
 ):
+    """Without paging parameters this returns Memory.get_all's response unchanged. With any of limit, cursor,
+    app, category or sort_by it returns {"results", "next_cursor", "total"}, one page at a time; total is
+    counted on the first page and carried through the cursor."""
     if not any([user_id, run_id, agent_id]):
         raise HTTPException(status_code=400, detail="At least one identifier is required.")
+    filters = {k: v for k, v in {"user_id": user_id, "run_id": run_id, "agent_id": agent_id}.items() if v is not None}
+    paginated = any(v is not None for v in (limit, cursor, app, category, sort_by))
+    if paginated:
+        _qdrant_store()
+    state = _decode_cursor(cursor, sort_by) if cursor else {}
     try:
-        filters = {k: v for k, v in {"user_id": user_id, "run_id": run_id, "agent_id": agent_id}.items() if v is not None}
-        return MEMORY_INSTANCE.get_all(filters=filters)
+        if paginated:
+            return await run_in_threadpool(
+                _list_memories_page,
+                filters, limit or LIST_DEFAULT_LIMIT, state, app, category, sort_by, order == "desc",
+            )
+        return await _memory_call("get_all", **filters)
     except Exception as e:
         logging.exception("Error in get_all_memories:")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ---- Stats ----
+# Dashboard aggregates from Qdrant facet (value counts over keyword indexes) and count queries, so the WebUI
+# no longer downloads full memory lists to compute totals.
+
+STATS_FACETS = {
+    "by_user": ("user_id",),
+    "by_agent": ("agent_id",),
+    "by_app": APP_PAYLOAD_KEYS,
+    "categories": ("categories",),
+}
+RECENT_WINDOWS = {"24h": timedelta(hours=24), "7d": timedelta(days=7), "30d": timedelta(days=30)}
+
+_stats_cache: Dict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]] = {}
+_stats_cache_lock = threading.Lock()
+
+
+def _facet_counts(
+    store: Qdrant, scope_filter: Optional[models.Filter], keys: Tuple[str, ...], top: int
+) -> Dict[str, int]:
+    """Value counts for the first of `keys` each point has set (source_app || app_name), so points carrying
+    several of the keys are counted once."""
+    counts: Dict[str, int] = {}
+    for index, key in enumerate(keys):
+        _ensure_payload_index(store, key, models.PayloadSchemaType.KEYWORD)
+        must = list(scope_filter.must) if scope_filter else []
+        must.extend(models.IsEmptyCondition(is_empty=models.PayloadField(key=earlier)) for earlier in keys[:index])
+        response = store.client.facet(
+            collection_name=store.collection_name,
+            key=key,
+            facet_filter=models.Filter(must=must) if must else None,
+            limit=top,
+            exact=True,
+        )
+        for hit in response.hits:
+            counts[str(hit.value)] = counts.get(str(hit.value), 0) + hit.count
+    return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top])
+
+
+def _count_since(store: Qdrant, scope_filter: Optional[models.Filter], field: str, since: datetime) -> int:
+    _ensure_payload_index(store, field, models.PayloadSchemaType.DATETIME)
+    must = list(scope_filter.must) if scope_filter else []
+    must.append(models.FieldCondition(key=field, range=models.DatetimeRange(gte=since)))
+    return store.client.count(
+        collection_name=store.collection_name, count_filter=models.Filter(must=must), exact=True
+    ).count
+
+
+def _compute_stats(ids: Dict[str, str], top: int) -> Dict[str, Any]:
+    store = _qdrant_store()
+    scope_filter = _listing_filter(ids, None, None) if ids else None
+    now = datetime.now(pytz.utc)
+
+    total = SEARCH_EXECUTOR.submit(
+        lambda: store.client.count(collection_name=store.collection_name, count_filter=scope_filter, exact=True).count
+    )
+    facets = {
+        name: SEARCH_EXECUTOR.submit(_facet_counts, store, scope_filter, keys, top)
+        for name, keys in STATS_FACETS.items()
+    }
+    recent = {
+        field: {
+            window: SEARCH_EXECUTOR.submit(_count_since, store, scope_filter, field, now - delta)
+            for window, delta in RECENT_WINDOWS.items()
+        }
+        for field in ("created_at", "updated_at")
+    }
+    return {
+        "total": total.result(),
+        **{name: future.result() for name, future in facets.items()},
+        "recent": {
+            field.split("_")[0]: {window: future.result() for window, future in windows.items()}
+            for field, windows in recent.items()
+        },
+        "generated_at": now.isoformat(),
+    }
+
+
+def _cached_stats(ids: Dict[str, str], top: int) -> Dict[str, Any]:
+    key = (tuple(sorted(ids.items())), top)
+    now = time.monotonic()
+    with _stats_cache_lock:
+        cached = _stats_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+    stats = _compute_stats(ids, top)
+    with _stats_cache_lock:
+        for stale in [k for k, (expires, _) in _stats_cache.items() if expires <= now]:
+            del _stats_cache[stale]
+        _stats_cache[key] = (now + STATS_CACHE_TTL, stats)
+    return stats
+
+
+@api_router.get("/stats", summary="Get memory statistics")
+async def get_stats(
+    user_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    top: int = Query(20, ge=1, le=1000, description="Maximum number of values per histogram."),
+    _api_key: Optional[str] = Depends(verify_api_key),
+):
+    """Totals, per user/agent/app counts, category histogram and recently created/updated counts.
+
+    Without identifiers the stats cover the whole collection. Results are cached for STATS_CACHE_TTL seconds.
+    """
+    filters = {k: v for k, v in {"user_id": user_id, "run_id": run_id, "agent_id": agent_id}.items() if v is not None}
+    _qdrant_store()
+    try:
+        return await run_in_threadpool(_cached_stats, filters, top)
+    except Exception as e:
+        logging.exception("Error in get_stats:")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @api_router.get("/memories/{memory_id}", summary="Get a memory")
-def get_memory(memory_id: str, _api_key: Optional[str] = Depends(verify_api_key)):
+async def get_memory(memory_id: str, _api_key: Optional[str] = Depends(verify_api_key)):
     try:
-        return MEMORY_INSTANCE.get(memory_id)
+        return await _memory_call("get", memory_id)
     except Exception as e:
         logging.exception("Error in get_memory:")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @api_router.get("/memories/{memory_id}/history", summary="Get memory history")
-def memory_history(memory_id: str, _api_key: Optional[str] = Depends(verify_api_key)):
+async def memory_history(memory_id: str, _api_key: Optional[str] = Depends(verify_api_key)):
     try:
-        return MEMORY_INSTANCE.history(memory_id=memory_id)
+        return await _memory_call("history", memory_id=memory_id)
     except Exception as e:
         logging.exception("Error in memory_history:")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @api_router.post("/search", summary="Search memories")
-def search_memories(search_req: SearchRequest, _api_key: Optional[str] = Depends(verify_api_key)):
+async def search_memories(search_req: SearchRequest, _api_key: Optional[str] = Depends(verify_api_key)):
     try:
-        entity_keys = {"user_id", "agent_id", "run_id"}
-        raw = {k: v for k, v in search_req.model_dump().items() if v is not None and k != "query"}
-        filters = {k: raw.pop(k) for k in list(raw) if k in entity_keys}
-        params = {**raw, **({"filters": filters} if filters else {})}
-        return MEMORY_INSTANCE.search(query=search_req.query, **params)
+        # Memory.search takes the identifiers as keyword arguments; filters only narrows within them
+        params = {
+            "user_id": search_req.user_id,
+            "agent_id": search_req.agent_id,
+            "run_id": search_req.run_id,
+            "filters": search_req.filters,
+            "limit": search_req.top_k,
+            "threshold": search_req.threshold,
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+        return await _memory_call("search", query=search_req.query, **params)
     except Exception as e:
         logging.exception("Error in search_memories:")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _check_query_vector(vector: List[float], embedding_model: Optional[str]) -> None:
+    """Reject vectors that were not produced by the server's embedder."""
+    embedder_config = MEMORY_INSTANCE.embedding_model.config
+    if embedding_model and embedding_model != embedder_config.model:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Vector was produced by {embedding_model}, server embeds with {embedder_config.model}.",
+        )
+    if embedder_config.embedding_dims and len(vector) != embedder_config.embedding_dims:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected a {embedder_config.embedding_dims}-dimensional vector, got {len(vector)}.",
+        )
+
+
+def _scope_filters(
+    user_id: Optional[str],
+    agent_id: Optional[str],
+    run_id: Optional[str],
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    filters = {k: v for k, v in {"user_id": user_id, "agent_id": agent_id, "run_id": run_id}.items() if v is not None}
+    if not filters:
+        raise HTTPException(status_code=400, detail="At least one identifier (user_id, agent_id, run_id) is required.")
+    if extra:
+        filters.update(extra)
+    return filters
+
+
+def _embed_texts(texts: List[str], memory_action: str = "search") -> List[List[float]]:
+    """Embed several texts through the embedding cache; misses go to the provider in one batch."""
+    embedder = MEMORY_INSTANCE.embedding_model
+    if isinstance(embedder, CachedEmbedder):
+        return embedder.embed_many(texts, lambda missing: _embed_uncached(embedder.embedder, missing, memory_action))
+    return _embed_uncached(embedder, texts, memory_action)
+
+
+def _embed_uncached(embedder: Any, texts: List[str], memory_action: str) -> List[List[float]]:
+    """Embed several texts with as few embedder calls as the provider allows (one request for OpenAI/Ollama)."""
+    config = embedder.config
+    if isinstance(embedder, OpenAIEmbedding):
+        response = embedder.client.embeddings.create(
+            input=[text.replace("\n", " ") for text in texts], model=config.model, dimensions=config.embedding_dims
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    if EMBEDDER_PROVIDER == "ollama" and hasattr(embedder.client, "embed"):
+        return [list(vector) for vector in embedder.client.embed(model=config.model, input=texts)["embeddings"]]
+    return list(SEARCH_EXECUTOR.map(lambda text: embedder.embed(text, memory_action), texts))
+
+
+def _vector_search(
+    vector: List[float], filters: Dict[str, Any], top_k: Optional[int], threshold: Optional[float]
+) -> List[Dict[str, Any]]:
+    """Query the vector store directly with an already computed embedding."""
+    memories = MEMORY_INSTANCE.vector_store.search(query="", vectors=vector, limit=top_k or 100, filters=filters)
+    return [_format_memory(mem) for mem in memories if threshold is None or mem.score >= threshold]
+
+
+@api_router.post("/search/vector", summary="Search memories by a precomputed query vector")
+def search_memories_by_vector(search_req: VectorSearchRequest, _api_key: Optional[str] = Depends(verify_api_key)):
+    """Skip the embedder: callers that already embedded the query (with the same model) pass the vector."""
+    _check_query_vector(search_req.vector, search_req.embedding_model)
+    filters = _scope_filters(search_req.user_id, search_req.agent_id, search_req.run_id, search_req.filters)
+    try:
+        return {"results": _vector_search(search_req.vector, filters, search_req.top_k, search_req.threshold)}
+    except Exception as e:
+        logging.exception("Error in search_memories_by_vector:")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@api_router.post("/search/multi", summary="Search one query across several scopes")
+def search_memories_multi(search_req: MultiSearchRequest, _api_key: Optional[str] = Depends(verify_api_key)):
+    """Embed the query once, then run one vector store query per scope concurrently; results are grouped by scope name."""
+    if search_req.vector is None and not search_req.query:
+        raise HTTPException(status_code=400, detail="Either query or vector is required.")
+    names = [scope.name for scope in search_req.scopes]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Scope names must be unique.")
+    if search_req.vector is not None:
+        _check_query_vector(search_req.vector, search_req.embedding_model)
+    scope_filters = {
+        scope.name: _scope_filters(scope.user_id, scope.agent_id, scope.run_id, scope.filters)
+        for scope in search_req.scopes
+    }
+    try:
+        vector = search_req.vector
+        if vector is None:
+            vector = MEMORY_INSTANCE.embedding_model.embed(search_req.query, "search")
+        futures = {
+            scope.name: SEARCH_EXECUTOR.submit(
+                _vector_search, vector, scope_filters[scope.name], scope.top_k, scope.threshold
+            )
+            for scope in search_req.scopes
+        }
+        return {"results": {name: future.result() for name, future in futures.items()}}
+    except Exception as e:
+        logging.exception("Error in search_memories_multi:")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@api_router.post("/search/batch", summary="Run many searches in one request")
+def search_memories_batch(batch_req: BatchSearchRequest, _api_key: Optional[str] = Depends(verify_api_key)):
+    """Embed all distinct queries in one embedder call, then run the vector store lookups concurrently.
+
+    Results are returned in request order; a failing lookup yields {"error": ...} for that item only.
+    """
+    if len(batch_req.searches) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} searches per batch.")
+    filters = [
+        _scope_filters(search.user_id, search.agent_id, search.run_id, search.filters)
+        for search in batch_req.searches
+    ]
+    try:
+        queries = list(dict.fromkeys(search.query for search in batch_req.searches))
+        vectors = dict(zip(queries, _embed_texts(queries)))
+    except Exception as e:
+        logging.exception("Error in search_memories_batch:")
+        raise HTTPException(status_code=500, detail=str(e))
+    futures = [
+        SEARCH_EXECUTOR.submit(_vector_search, vectors[search.query], search_filters, search.top_k, search.threshold)
+        for search, search_filters in zip(batch_req.searches, filters)
+    ]
+    results = []
+    for future in futures:
+        try:
+            results.append({"results": future.result()})
+        except Exception as e:
+            logging.exception("Error in search_memories_batch lookup:")
+            results.append({"error": str(e)})
+    return {"results": results}
+
+
 @api_router.put("/memories/{memory_id}", summary="Update a memory")
-def update_memory(memory_id: str, updated_memory: MemoryUpdate, _api_key: Optional[str] = Depends(verify_api_key)):
+async def update_memory(memory_id: str, updated_memory: MemoryUpdate, _api_key: Optional[str] = Depends(verify_api_key)):
     try:
-        return MEMORY_INSTANCE.update(memory_id=memory_id, data=updated_memory.text, metadata=updated_memory.metadata)
+        return await _memory_call(
+            "update", memory_id=memory_id, data=updated_memory.text, metadata=updated_memory.metadata
+        )
     except Exception as e:
         logging.exception("Error in update_memory:")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @api_router.delete("/memories/{memory_id}", summary="Delete a memory")
-def delete_memory(memory_id: str, _api_key: Optional[str] = Depends(verify_api_key)):
+async def delete_memory(memory_id: str, _api_key: Optional[str] = Depends(verify_api_key)):
     try:
-        MEMORY_INSTANCE.delete(memory_id=memory_id)
+        await _memory_call("delete", memory_id=memory_id)
         return {"message": "Memory deleted successfully"}
     except Exception as e:
         logging.exception("Error in delete_memory:")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _bulk_delete(ids: Dict[str, str]) -> Dict[str, Any]:
+    """Delete every memory in the scope with a few Qdrant delete-by-id calls.
+
+    Memory.delete_all (mem0 1.0.1) deletes the first 100 matches one at a time and then resets the whole
+    collection. Here the scope is scrolled once and exactly the scrolled points are deleted (1000 ids per
+    call), so a memory added concurrently is never removed without a history row. The DELETE history rows
+    go into SQLite in one transaction after the vectors are gone.
+    """
+    store = _qdrant_store()
+    scope_filter = _listing_filter(ids, None, None)
+    deleted_at = datetime.now(pytz.timezone("US/Pacific")).isoformat()
+    point_ids: List[Any] = []
+    history: List[Tuple[Any, ...]] = []
+    offset = None
+    while True:
+        points, offset = store.client.scroll(
+            collection_name=store.collection_name,
+            scroll_filter=scope_filter,
+            limit=1000,
+            offset=offset,
+            with_payload=["data", "actor_id", "role", "created_at"],
+            with_vectors=False,
+        )
+        for point in points:
+            payload = point.payload or {}
+            point_ids.append(point.id)
+            history.append((
+                str(uuid.uuid4()), str(point.id), payload.get("data", ""), None, "DELETE",
+                payload.get("created_at"), deleted_at, 1, payload.get("actor_id"), payload.get("role"),
+            ))
+        if offset is None:
+            break
+    for start in range(0, len(point_ids), 1000):
+        store.client.delete(
+            collection_name=store.collection_name,
+            points_selector=models.PointIdsList(points=point_ids[start:start + 1000]),
+            wait=True,
+        )
+    if history:
+        _bulk_add_history(history)
+    if MEMORY_INSTANCE.enable_graph:
+        MEMORY_INSTANCE.graph.delete_all(ids)
+    logging.info(f"Bulk deleted {len(history)} memories for {ids}")
+    return {"message": "All relevant memories deleted", "deleted": len(history)}
+
+
 @api_router.delete("/memories", summary="Delete all memories")
-def delete_all_memories(
+async def delete_all_memories(
     user_id: Optional[str] = None,
     run_id: Optional[str] = None,
     agent_id: Optional[str] = None,
@@ -275,7 +1615,9 @@ def delete_all_memories(
         raise HTTPException(status_code=400, detail="At least one identifier is required.")
     try:
         params = {k: v for k, v in {"user_id": user_id, "run_id": run_id, "agent_id": agent_id}.items() if v is not None}
-        MEMORY_INSTANCE.delete_all(**params)
+        if isinstance(MEMORY_INSTANCE.vector_store, Qdrant):
+            return await run_in_threadpool(_bulk_delete, params)
+        await _memory_call("delete_all", **params)
         return {"message": "All relevant memories deleted"}
     except Exception as e:
         logging.exception("Error in delete_all_memories:")
@@ -283,9 +1625,10 @@ def delete_all_memories(
 
 
 @api_router.post("/reset", summary="Reset all memories")
-def reset_memory(_api_key: Optional[str] = Depends(verify_api_key)):
+async def reset_memory(_api_key: Optional[str] = Depends(verify_api_key)):
     try:
-        MEMORY_INSTANCE.reset()
+        await _memory_call("reset")
+        await run_in_threadpool(_tune_vector_store, MEMORY_INSTANCE)
         return {"message": "All memories reset"}
     except Exception as e:
         logging.exception("Error in reset_memory:")
@@ -295,6 +1638,70 @@ def reset_memory(_api_key: Optional[str] = Depends(verify_api_key)):
 app.include_router(api_router)
 
 
+def _render_metrics() -> str:
+    """Prometheus text format for server-side queues and caches."""
+    jobs = JOB_QUEUE.stats()
+    metrics = [
+        ("mem0_job_queue_depth", "gauge", "Jobs waiting in the background job queue.", [("", jobs["queue_depth"])]),
+        ("mem0_jobs_running", "gauge", "Jobs currently being processed.", [("", jobs["running"])]),
+        (
+            "mem0_jobs_total", "counter", "Finished or rejected background jobs by status.",
+            [(f'{{status="{status}"}}', jobs[status]) for status in ("succeeded", "failed", "rejected")],
+        ),
+        (
+            "mem0_job_wait_seconds", "summary", "Time jobs spent queued before a worker picked them up.",
+            [("_sum", jobs["wait_seconds_sum"]), ("_count", jobs["wait_seconds_count"])],
+        ),
+        (
+            "mem0_job_processing_seconds", "summary", "Time spent processing background jobs.",
+            [("_sum", jobs["processing_seconds_sum"]), ("_count", jobs["processing_seconds_count"])],
+        ),
+    ]
+    if EMBEDDING_CACHE is not None:
+        embeddings = EMBEDDING_CACHE.stats()
+        metrics += [
+            (
+                "mem0_embedding_cache_lookups_total", "counter", "Embedding cache lookups by result.",
+                [(f'{{result="{result}"}}', embeddings[result]) for result in ("memory_hit", "disk_hit", "miss")],
+            ),
+            (
+                "mem0_embedding_cache_hit_ratio", "gauge", "Share of embedding lookups served from the cache.",
+                [("", embeddings["hit_ratio"])],
+            ),
+            (
+                "mem0_embedding_cache_memory_entries", "gauge", "Vectors held in the in-memory LRU tier.",
+                [("", embeddings["memory_entries"])],
+            ),
+        ]
+    if EXTRACTION_CACHE is not None:
+        extractions = EXTRACTION_CACHE.stats()
+        metrics += [
+            (
+                "mem0_extraction_cache_lookups_total", "counter", "Fact-extraction cache lookups by result.",
+                [(f'{{result="{result}"}}', extractions[result]) for result in ("hit", "miss")],
+            ),
+            (
+                "mem0_extraction_cache_hit_ratio", "gauge", "Share of fact extractions served from the cache.",
+                [("", extractions["hit_ratio"])],
+            ),
+            (
+                "mem0_extraction_cache_entries", "gauge", "Fact-extraction responses held in the cache.",
+                [("", extractions["entries"])],
+            ),
+        ]
+    lines = []
+    for name, kind, documentation, samples in metrics:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{name}{suffix} {float(value)}" for suffix, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+@app.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(_render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/", summary="Redirect to the OpenAPI documentation", include_in_schema=False)
 def home():
     return RedirectResponse(url="/docs")
@@ -0,0 +1,112 @@
+"""Tests for POST /api/v1/memories/batch against a local Qdrant with a stub LLM and embedder.
+
+Run from deployment/mem0 with the server requirements installed:
+    python -m pytest -q test_batch_ingest.py
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+
+TMP_DIR = tempfile.mkdtemp()
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["MEM0_TELEMETRY"] = "False"
+os.environ["HISTORY_DB_PATH"] = os.path.join(TMP_DIR, "history.db")
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+os.environ["EXTRACTION_CACHE_SIZE"] = "0"
+
+import mem0  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+EMBEDDING_DIMS = 8
+_from_config = mem0.Memory.from_config.__func__
+
+
+def _local_from_config(cls, config):
+    """Same config, but Qdrant in local path mode so no server is needed."""
+    config = json.loads(json.dumps(config))
+    config["vector_store"] = {
+        "provider": "qdrant",
+        "config": {
+            "path": os.path.join(TMP_DIR, "qdrant"),
+            "collection_name": "memories",
+            "embedding_model_dims": EMBEDDING_DIMS,
+            "on_disk": True,
+        },
+    }
+    config["embedder"]["config"]["embedding_dims"] = EMBEDDING_DIMS
+    return _from_config(cls, config)
+
+
+mem0.Memory.from_config = classmethod(_local_from_config)
+
+
+class StubEmbedder:
+    def __init__(self, config):
+        self.config = config
+
+    def embed(self, text, memory_action=None):
+        digest = hashlib.md5(text.encode()).digest()
+        return [byte / 255 for byte in digest[:EMBEDDING_DIMS]]
+
+
+class StubLLM:
+    """Fact extraction returns `facts`; the update decision returns `actions`."""
+
+    def __init__(self, facts, actions):
+        self.facts = facts
+        self.actions = actions
+
+    def generate_response(self, messages, response_format=None, **kwargs):
+        if len(messages) == 2:
+            return json.dumps({"facts": self.facts})
+        return json.dumps({"memory": self.actions})
+
+
+def _load_server():
+    spec = importlib.util.spec_from_file_location(
+        "mem0_server", os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.MEMORY_INSTANCE.embedding_model = StubEmbedder(module.MEMORY_INSTANCE.embedding_model.config)
+    return module
+
+
+server = _load_server()
+client = TestClient(server.app)
+
+
+def _batch(user_id):
+    return {"items": [{"messages": [{"role": "user", "content": "I switched from tea to coffee"}], "user_id": user_id}]}
+
+
+def test_unknown_update_is_added():
+    """An UPDATE whose id is not among the retrieved memories is stored as an ADD, like the patched Memory.add."""
+    server.MEMORY_INSTANCE.llm = StubLLM(
+        facts=["likes coffee"],
+        actions=[{"id": "7", "text": "likes coffee", "event": "UPDATE", "old_memory": "likes tea"}],
+    )
+    response = client.post("/api/v1/memories/batch", json=_batch("unknown-update"))
+    assert response.status_code == 200
+    events = response.json()["results"][0]["results"]
+    assert [(event["memory"], event["event"]) for event in events] == [("likes coffee", "ADD")]
+
+    stored = client.get("/api/v1/memories", params={"user_id": "unknown-update"}).json()["results"]
+    assert [memory["memory"] for memory in stored] == ["likes coffee"]
+
+
+def test_unknown_delete_is_skipped():
+    server.MEMORY_INSTANCE.llm = StubLLM(
+        facts=["likes coffee"],
+        actions=[{"id": "7", "text": "likes tea", "event": "DELETE"}],
+    )
+    response = client.post("/api/v1/memories/batch", json=_batch("unknown-delete"))
+    assert response.status_code == 200
+    assert response.json()["results"][0]["results"] == []
+
+
+if __name__ == "__main__":
+    sys.exit(__import__("pytest").main(["-q", __file__]))
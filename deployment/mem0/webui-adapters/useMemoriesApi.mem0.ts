@@ -3,7 +3,7 @@
  * 将 OpenMemory UI 的接口调用适配到 Mem0 API
  */
 
-import { useState, useCallback } from 'react';
+import { useState, useCallback, useRef } from 'react';
 import axios from 'axios';
 import { Memory, Category } from '@/components/types';
 import { useDispatch, useSelector } from 'react-redux';
@@ -27,11 +27,17 @@ interface Mem0SearchResponse {
   }>;
 }
 
-interface Mem0GetAllResponse {
+// 分页列表响应（GET /api/v1/memories?limit=...）
+interface Mem0PageResponse {
   results: Mem0Memory[];
-  relations?: Array<any>; // 图数据库关系（可选）
+  next_cursor: string | null;
+  total: number;
 }
 
+// 服务端支持排序的列（Qdrant order_by 只支持时间/数值索引）；
+// 分页模式下其他列（memory、app_name）不排序，按服务端默认顺序返回，避免只在当前页内排序造成误导
+export const SERVER_SORT_COLUMNS = ['created_at', 'updated_at'];
+
 interface SimpleMemory {
   id: string;
   text: string;
@@ -80,6 +86,9 @@ export const useMemoriesApi = (): UseMemoriesApiReturn => {
   // Mem0 API URL (默认端口 8888)
   const URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8888";
 
+  // 服务端游标分页：按查询条件缓存每页的起始游标（第 1 页为 null）
+  const cursorCache = useRef<{ key: string; cursors: (string | null)[] }>({ key: '', cursors: [null] });
+
   // 前端分页和过滤实现
   const applyFilters = (items: Memory[], filters?: {
     apps?: string[];
@@ -171,20 +180,49 @@ export const useMemoriesApi = (): UseMemoriesApiReturn => {
           app_name: item.metadata?.source_app || 'mem0'
         }));
       } else {
-        // 获取所有记忆
-        const response = await axios.get<Mem0GetAllResponse>(
-          `${URL}/api/v1/memories`,
-          {
-            params: { user_id: user_id }
+        // 服务端分页：app / category 过滤和时间排序在服务端完成，只拉取当前页
+        const sortBy = filters?.sortColumn && SERVER_SORT_COLUMNS.includes(filters.sortColumn)
+          ? filters.sortColumn
+          : undefined;
+        const baseParams: Record<string, any> = {
+          user_id: user_id,
+          limit: size,
+          app: filters?.apps?.length ? filters.apps : undefined,
+          category: filters?.categories?.length ? filters.categories : undefined,
+          sort_by: sortBy,
+          order: sortBy ? (filters?.sortDirection || 'desc') : undefined
+        };
+
+        // 查询条件变化时清空游标缓存
+        const cacheKey = JSON.stringify(baseParams);
+        if (cursorCache.current.key !== cacheKey) {
+          cursorCache.current = { key: cacheKey, cursors: [null] };
+        }
+        const cursors = cursorCache.current.cursors;
+
+        // 游标只能顺序前进：跳页时从最近的已知页开始逐页获取
+        let pageIndex = Math.min(page, cursors.length) - 1;
+        let pageData: Mem0PageResponse = { results: [], next_cursor: null, total: 0 };
+        while (true) {
+          const response = await axios.get<Mem0PageResponse>(
+            `${URL}/api/v1/memories`,
+            {
+              params: { ...baseParams, cursor: cursors[pageIndex] || undefined },
+              paramsSerializer: { indexes: null } // app=a&app=b
+            }
+          );
+          pageData = response.data;
+          if (pageIndex + 1 >= cursors.length) {
+            cursors.push(pageData.next_cursor);
           }
-        );
-        
-        // 处理响应格式：{results: [...], relations: [...]}
-        // relations 是图数据库关系，当前不需要处理
-        const results = response.data.results || [];
-        
-        allMemories = results.map((item) => ({
-          id: item.id || String(item),
+          if (pageIndex + 1 >= page || !pageData.next_cursor) {
+            break;
+          }
+          pageIndex += 1;
+        }
+
+        const pageMemories: Memory[] = (pageData.results || []).map((item) => ({
+          id: item.id,
           memory: item.memory || '',
           created_at: item.created_at || Date.now(),
           state: "active" as const,
@@ -193,9 +231,21 @@ export const useMemoriesApi = (): UseMemoriesApiReturn => {
           client: 'api',
           app_name: item.metadata?.source_app || item.metadata?.app_name || 'mem0'
         }));
+
+        if (filters?.sortColumn && !sortBy) {
+          console.warn(`[Mem0 Adapter] Sorting by ${filters.sortColumn} is not supported with server-side paging; using server order`);
+        }
+        const total = pageData.total;
+        setIsLoading(false);
+        dispatch(setMemoriesSuccess(pageMemories));
+        return {
+          memories: pageMemories,
+          total: total,
+          pages: Math.ceil(total / size)
+        };
       }
 
-      // 应用前端过滤
+      // 搜索结果：前端过滤
       const filtered = applyFilters(allMemories, filters);
       
       // 前端分页
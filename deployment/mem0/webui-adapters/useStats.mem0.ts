@@ -1,6 +1,6 @@
 /**
  * Mem0 API 适配的 useStats Hook
- * 通过调用 Mem0 API 计算统计数据
+ * 通过 Mem0 API 的 /api/v1/stats 获取服务端聚合的统计数据
  */
 
 import { useState } from 'react';
@@ -10,6 +10,20 @@ import { AppDispatch, RootState } from '@/store/store';
 import { setApps, setTotalApps } from '@/store/profileSlice';
 import { setTotalMemories } from '@/store/profileSlice';
 
+// GET /api/v1/stats 响应
+interface Mem0StatsResponse {
+  total: number;
+  by_user: Record<string, number>;
+  by_agent: Record<string, number>;
+  by_app: Record<string, number>;
+  categories: Record<string, number>;
+  recent: {
+    created: Record<string, number>;
+    updated: Record<string, number>;
+  };
+  generated_at: string;
+}
+
 interface UseMemoriesApiReturn {
   fetchStats: () => Promise<void>;
   isLoading: boolean;
@@ -28,17 +42,28 @@ export const useStats = (): UseMemoriesApiReturn => {
     setIsLoading(true);
     setError(null);
     try {
-      // 获取所有记忆来计算总数
-      const response = await axios.get(`${URL}/api/v1/memories`, {
+      // 服务端聚合统计（不再拉取全部记忆）
+      const response = await axios.get<Mem0StatsResponse>(`${URL}/api/v1/stats`, {
         params: { user_id: user_id }
       });
-      
-      const memories = response.data.results || [];
-      const totalMemories = memories.length;
-      
-      dispatch(setTotalMemories(totalMemories));
-      dispatch(setTotalApps(1)); // Mem0 只有一个默认应用
-      dispatch(setApps([{ id: 'mem0-default', name: 'Mem0' }]));
+
+      const stats = response.data;
+      const apps = Object.entries(stats.by_app || {}).map(([name, count]) => ({
+        id: name,
+        name: name,
+        total_memories_created: count
+      }));
+
+      dispatch(setTotalMemories(stats.total));
+      if (apps.length > 0) {
+        dispatch(setTotalApps(apps.length));
+        dispatch(setApps(apps));
+      } else {
+        // 记忆未记录来源应用时使用默认应用
+        dispatch(setTotalApps(1));
+        dispatch(setApps([{ id: 'mem0-default', name: 'Mem0' }]));
+      }
+      setIsLoading(false);
     } catch (err: any) {
       const errorMessage = err.message || 'Failed to fetch stats';
       setError(errorMessage);
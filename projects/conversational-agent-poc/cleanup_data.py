@@ -28,83 +28,41 @@ async def cleanup_mem0_data():
     print("="*60)
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # 方法1：尝试获取所有记忆并删除
-            print(f"\n检查 {TEST_USER_ID} 的记忆...")
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            # 服务端按过滤条件批量删除（一次 Qdrant delete-by-filter + 一次历史记录事务）
+            print(f"\n删除用户 {TEST_USER_ID} 的所有记忆...")
+            response = await client.delete(
+                f"{MEM0_URL}/api/v1/memories",
+                params={"user_id": TEST_USER_ID}
+            )
             
-            # 搜索用户的所有记忆
-            try:
-                response = await client.post(
-                    f"{MEM0_URL}/api/v1/search",
-                    json={
-                        "query": "",
-                        "user_id": TEST_USER_ID
-                    }
-                )
-                
-                if response.status_code == 200:
-                    memories = response.json()
-                    print(f"   找到 {len(memories) if memories else 0} 条记忆")
-                    
-                    # 尝试删除每条记忆
-                    if memories and isinstance(memories, list):
-                        for i, memory in enumerate(memories, 1):
-                            memory_id = None
-                            if isinstance(memory, dict):
-                                memory_id = memory.get('id') or memory.get('memory_id')
-                            
-                            if memory_id:
-                                try:
-                                    # 尝试删除记忆
-                                    del_response = await client.delete(
-                                        f"{MEM0_URL}/api/v1/memories/{memory_id}"
-                                    )
-                                    if del_response.status_code in [200, 204]:
-                                        print(f"   ✅ 删除记忆 {i}/{len(memories)}")
-                                    else:
-                                        print(f"   ⚠️  删除记忆 {i} 失败: {del_response.status_code}")
-                                except Exception as e:
-                                    print(f"   ⚠️  删除记忆 {i} 错误: {e}")
+            if response.status_code in [200, 204]:
+                result = response.json() if response.content else {}
+                if "deleted" in result:
+                    print(f"   ✅ 批量删除成功，共删除 {result['deleted']} 条记忆")
                 else:
-                    print(f"   ℹ️  搜索返回: {response.status_code}")
-            except Exception as e:
-                print(f"   ⚠️  搜索记忆错误: {e}")
-            
-            # 方法2：尝试删除整个用户的记忆
-            print(f"\n尝试删除用户 {TEST_USER_ID} 的所有记忆...")
-            try:
-                # Mem0 可能提供的批量删除 API
-                response = await client.delete(
-                    f"{MEM0_URL}/api/v1/memories",
-                    params={"user_id": TEST_USER_ID}
-                )
-                
-                if response.status_code in [200, 204]:
+                    # 旧版服务器不返回删除数量
                     print(f"   ✅ 批量删除成功")
-                elif response.status_code == 404:
-                    print(f"   ℹ️  该用户没有记忆数据")
-                else:
-                    print(f"   ⚠️  批量删除返回: {response.status_code}")
-            except Exception as e:
-                print(f"   ℹ️  批量删除接口不可用或出错: {e}")
+            elif response.status_code == 404:
+                print(f"   ℹ️  该用户没有记忆数据")
+            else:
+                print(f"   ⚠️  批量删除返回: {response.status_code} - {response.text[:200]}")
             
             # 验证清除结果
             print(f"\n验证清除结果...")
             try:
-                response = await client.post(
-                    f"{MEM0_URL}/api/v1/search",
-                    json={
-                        "query": "张三",
-                        "user_id": TEST_USER_ID
-                    }
+                response = await client.get(
+                    f"{MEM0_URL}/api/v1/memories",
+                    params={"user_id": TEST_USER_ID, "limit": 1}
                 )
                 
                 if response.status_code == 200:
-                    memories = response.json()
-                    if not memories or len(memories) == 0:
+                    data = response.json()
+                    remaining = data.get("total", len(data.get("results", []))) if isinstance(data, dict) else len(data)
+                    if remaining == 0:
                         print(f"   ✅ Mem0 数据已清空")
                     else:
-                        print(f"   ⚠️  仍有 {len(memories)} 条记忆")
+                        print(f"   ⚠️  仍有 {remaining} 条记忆")
                         print(f"   💡 提示：可能需要手动清理或重启 Mem0 服务")
             except Exception as e:
                 print(f"   ℹ️  验证时出错: {e}")
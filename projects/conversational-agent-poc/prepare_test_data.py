@@ -17,6 +17,25 @@ TEST_SESSION_ID = "test_session_001"
 DATASET_NAME = "kb_tech"
 
 
+def invalidate_knowledge_cache(dataset_name: str):
+    """重新 cognify 后递增数据集版本，对话服务的知识检索缓存随即失效（各 worker 数秒内生效）"""
+    try:
+        from src.config import settings
+        from src.services.knowledge_cache import KnowledgeCache
+        
+        if not settings.knowledge_cache_db_path:
+            print(f"   ⚠️  未配置 KNOWLEDGE_CACHE_DB_PATH，请调用 POST /api/v1/knowledge/datasets/{dataset_name}/invalidate")
+            return
+        cache = KnowledgeCache(db_path=settings.knowledge_cache_db_path)
+        try:
+            version = cache.bump_dataset_version(dataset_name)
+        finally:
+            cache.close()
+        print(f"   ✅ 知识缓存已失效（{dataset_name} 版本 {version}）")
+    except Exception as e:
+        print(f"   ⚠️  知识缓存失效失败: {e}")
+
+
 async def prepare_cognee_data():
     """为 Cognee 准备知识库数据"""
     print("\n" + "="*60)
@@ -156,6 +175,7 @@ Python 是一种解释型、面向对象、动态数据类型的高级程序设
                 
                 if response.status_code == 200:
                     print(f"   ✅ 知识库处理完成")
+                    invalidate_knowledge_cache(DATASET_NAME)
                 else:
                     print(f"   ⚠️  知识库处理失败: {response.status_code}")
             except Exception as e:
@@ -215,37 +235,51 @@ async def prepare_mem0_data():
                 },
             ]
             
-            # 添加对话记忆到 Mem0
-            for i, conv in enumerate(conversations, 1):
-                print(f"\n添加对话记忆 {i}/{len(conversations)}...")
-                try:
-                    payload = {
-                        "messages": conv["messages"],
-                        "user_id": TEST_USER_ID,
-                        "agent_id": TEST_SESSION_ID,
-                        "metadata": conv["metadata"]
-                    }
-                    
-                    response = await client.post(
-                        f"{MEM0_URL}/api/v1/memories",
-                        json=payload
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        print(f"   ✅ 对话记忆 {i} 添加成功")
-                        # 显示提取的记忆
-                        if isinstance(result, dict) and "results" in result:
-                            for memory in result["results"][:3]:
-                                if isinstance(memory, dict) and "memory" in memory:
-                                    print(f"      - {memory['memory']}")
-                    else:
-                        print(f"   ⚠️  对话记忆 {i} 添加失败: {response.status_code} - {response.text}")
-                except Exception as e:
-                    print(f"   ❌ 对话记忆 {i} 添加错误: {e}")
-                
-                # 等待一下让 Mem0 处理
-                await asyncio.sleep(1)
+            # 添加对话记忆到 Mem0：优先一次批量写入（服务器合并事实抽取与向量化）
+            items = [
+                {
+                    "messages": conv["messages"],
+                    "user_id": TEST_USER_ID,
+                    "agent_id": TEST_SESSION_ID,
+                    "metadata": conv["metadata"]
+                }
+                for conv in conversations
+            ]
+            print(f"\n批量添加 {len(items)} 组对话记忆...")
+            response = await client.post(
+                f"{MEM0_URL}/api/v1/memories/batch",
+                json={"items": items},
+                timeout=300.0
+            )
+            if response.status_code == 200:
+                results = response.json()["results"]
+            else:
+                # 旧版服务器没有批量接口：逐条添加
+                print(f"   ⚠️  批量接口不可用（{response.status_code}），改为逐条添加")
+                results = []
+                for i, payload in enumerate(items, 1):
+                    print(f"\n添加对话记忆 {i}/{len(items)}...")
+                    try:
+                        item_response = await client.post(f"{MEM0_URL}/api/v1/memories", json=payload)
+                        if item_response.status_code == 200:
+                            results.append(item_response.json())
+                        else:
+                            results.append({"error": f"{item_response.status_code} - {item_response.text}"})
+                    except Exception as e:
+                        results.append({"error": str(e)})
+                    # 等待一下让 Mem0 处理
+                    await asyncio.sleep(1)
+            
+            for i, result in enumerate(results, 1):
+                if isinstance(result, dict) and "error" in result:
+                    print(f"   ⚠️  对话记忆 {i} 添加失败: {result['error']}")
+                    continue
+                print(f"   ✅ 对话记忆 {i} 添加成功")
+                # 显示提取的记忆
+                if isinstance(result, dict) and "results" in result:
+                    for memory in result["results"][:3]:
+                        if isinstance(memory, dict) and "memory" in memory:
+                            print(f"      - {memory['memory']}")
             
             print(f"\n✅ Mem0 会话记忆数据准备完成！")
             print(f"   用户ID: {TEST_USER_ID}")
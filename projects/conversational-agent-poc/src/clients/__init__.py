@@ -2,10 +2,14 @@
 from .cognee_client import CogneeClientWrapper
 from .memobase_client import MemobaseClientWrapper
 from .mem0_client import Mem0ClientWrapper
+from .search_policy import AdaptiveSearchPolicy
+from .embedding_client import EmbeddingClient
 
 __all__ = [
     "CogneeClientWrapper",
     "MemobaseClientWrapper",
     "Mem0ClientWrapper",
+    "AdaptiveSearchPolicy",
+    "EmbeddingClient",
 ]
 
@@ -1,9 +1,13 @@
 """Cognee 客户端封装"""
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from cognee_sdk import CogneeClient, SearchType
 from ..config import settings
+from ..metrics import KNOWLEDGE_FALLBACKS, KNOWLEDGE_SEARCH_WINS, SOURCE_ERRORS
+from .search_policy import AdaptiveSearchPolicy
+from .ranking import reciprocal_rank_fusion
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +20,19 @@ class CogneeClientWrapper:
             api_url=settings.cognee_api_url,
             api_token=settings.cognee_api_token
         )
+        # 各数据集的模式统计始终记录，adaptive 策略据此选择检索方式
+        self.policy = AdaptiveSearchPolicy(
+            path=settings.cognee_policy_path,
+            default_hedge_delay=settings.cognee_hedge_delay
+        )
     
     async def search_knowledge(
         self,
         query: str,
         dataset_names: List[str],
-        top_k: int = 5
+        top_k: int = 5,
+        strategy: Optional[str] = None,
+        fanout: Optional[bool] = None
     ) -> List[Dict[str, Any]]:
         """
         从多个知识库检索知识
@@ -30,6 +41,13 @@ class CogneeClientWrapper:
             query: 查询文本
             dataset_names: 数据集名称列表
             top_k: 返回结果数量
+            strategy: 检索策略，默认使用 settings.cognee_search_strategy
+                - sequential: 先 CHUNKS，为空或失败再 GRAPH_COMPLETION
+                - hedged: 先 CHUNKS，cognee_hedge_delay 秒内未命中则并行发起 GRAPH_COMPLETION
+                - parallel: 同时发起两种模式
+                - adaptive: 按数据集的历史命中率与延迟在 sequential / hedged /
+                  graph_only（直接 GRAPH_COMPLETION）中选择
+            fanout: 是否按数据集分别并发检索后融合排序，默认使用 settings.cognee_dataset_fanout
         
         Returns:
             知识检索结果列表
@@ -37,38 +55,61 @@ class CogneeClientWrapper:
         if not dataset_names:
             return []
         
+        if fanout is None:
+            fanout = settings.cognee_dataset_fanout
+        if fanout and len(dataset_names) > 1:
+            return await self._fanout_search(query, dataset_names, top_k, strategy)
+        return await self._search_datasets(query, dataset_names, top_k, strategy)
+    
+    async def _fanout_search(
+        self,
+        query: str,
+        dataset_names: List[str],
+        top_k: int,
+        strategy: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        每个数据集单独并发检索（各自 top_k），保留真实来源，
+        再用 reciprocal-rank fusion 融合排序并去除近似重复片段
+        """
+        logger.info(f"🔀 按数据集并发检索: {dataset_names}")
+        per_dataset = await asyncio.gather(*[
+            self._search_datasets(query, [name], top_k, strategy)
+            for name in dataset_names
+        ])
+        merged = reciprocal_rank_fusion(list(per_dataset), top_k=top_k)
+        logger.info(
+            f"✅ 融合后知识数: {len(merged)}（各数据集: "
+            f"{dict(zip(dataset_names, (len(r) for r in per_dataset)))}）"
+        )
+        return merged
+    
+    async def _search_datasets(
+        self,
+        query: str,
+        dataset_names: List[str],
+        top_k: int,
+        strategy: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """对一组数据集执行一次检索并解析结果（失败返回空列表）"""
+        strategy = strategy or settings.cognee_search_strategy
+        hedge_delay = settings.cognee_hedge_delay
+        if strategy == "adaptive":
+            strategy = self.policy.choose(dataset_names)
+            hedge_delay = self.policy.hedge_delay(dataset_names, hedge_delay)
+            logger.info(f"🧭 自适应策略选择: {strategy}")
         try:
-            # 🎯 性能优化策略：尝试多种搜索模式
-            # 优先使用快速模式，失败则降级到慢速但稳定的模式
-            results = None
-            
-            # 策略1: 先尝试 CHUNKS（快但可能返回空）
-            try:
-                logger.info(f"🚀 尝试 CHUNKS 模式...")
-                results = await self.client.search(
-                    query=query,
-                    datasets=dataset_names,
-                    search_type=SearchType.CHUNKS,
-                    top_k=top_k
-                )
-                if results and len(results) > 0:
-                    logger.info(f"✅ CHUNKS 模式成功，返回 {len(results)} 条")
-                else:
-                    logger.warning(f"⚠️ CHUNKS 模式返回空，降级到 GRAPH_COMPLETION")
-                    results = None
-            except Exception as e:
-                logger.warning(f"⚠️ CHUNKS 模式失败: {e}，降级到 GRAPH_COMPLETION")
-                results = None
-            
-            # 策略2: 如果 CHUNKS 失败，使用 GRAPH_COMPLETION
-            if not results:
-                logger.info(f"🐌 使用 GRAPH_COMPLETION 模式（较慢但稳定）")
-                results = await self.client.search(
-                    query=query,
-                    datasets=dataset_names,
-                    search_type=SearchType.GRAPH_COMPLETION,
-                    top_k=top_k
-                )
+            if strategy == "graph_only":
+                results = await self._search_mode(query, dataset_names, top_k, SearchType.GRAPH_COMPLETION)
+                mode = "graph_completion" if results else "none"
+            elif strategy == "hedged":
+                results, mode = await self._hedged_search(query, dataset_names, top_k, hedge_delay)
+            elif strategy == "parallel":
+                results, mode = await self._hedged_search(query, dataset_names, top_k, 0.0)
+            else:
+                results, mode = await self._sequential_search(query, dataset_names, top_k)
+            KNOWLEDGE_SEARCH_WINS.inc(strategy=strategy, mode=mode)
+            logger.info(f"🏁 Cognee 检索策略 {strategy}，命中模式: {mode}")
             
             # 🔍 调试：记录原始返回结果
             logger.info(f"🔍 Cognee 原始返回: type={type(results)}, len={len(results) if hasattr(results, '__len__') else 'N/A'}")
@@ -78,43 +119,7 @@ class CogneeClientWrapper:
             else:
                 logger.warning(f"⚠️ Cognee 返回空结果！query={query}, datasets={dataset_names}")
             
-            # 解析 Cognee SDK 返回的结果
-            knowledge_results = []
-            for i, result in enumerate(results):
-                content = None
-                default_score = 1.0 - (i * 0.1)  # 按顺序递减分数
-                score = default_score
-                
-                if isinstance(result, str):
-                    # 字符串格式（GRAPH_COMPLETION 模式）
-                    content = result
-                elif hasattr(result, 'text'):
-                    # SearchResult 对象格式（CHUNKS 模式）
-                    content = result.text
-                    # 获取 score，如果是 None 或无效值则使用默认值
-                    result_score = getattr(result, 'score', None)
-                    score = result_score if result_score is not None else default_score
-                    logger.info(f"  📄 CHUNKS 结果 {i+1}: text 长度={len(result.text)}, score={score}")
-                elif hasattr(result, 'content'):
-                    # 其他对象格式（备用）
-                    content = result.content
-                    result_score = getattr(result, 'score', None)
-                    score = result_score if result_score is not None else default_score
-                elif isinstance(result, dict):
-                    # 字典格式（备用）
-                    content = result.get("text") or result.get("content") or str(result)
-                    result_score = result.get("score")
-                    score = result_score if result_score is not None else default_score
-                
-                if content:
-                    knowledge_results.append({
-                        "content": content,
-                        "score": score,
-                        "source": dataset_names[0] if dataset_names else "unknown"
-                    })
-                else:
-                    logger.warning(f"  ⚠️ 无法解析结果 {i+1}: type={type(result)}, attributes={dir(result)[:10]}")
-            
+            knowledge_results = self._parse_results(results, dataset_names)
             logger.info(f"✅ 解析后知识数: {len(knowledge_results)}")
             return knowledge_results
         except Exception as e:
@@ -124,9 +129,167 @@ class CogneeClientWrapper:
                 logger.warning(f"Dataset not found in Cognee: {dataset_names}. Error: {error_msg}")
             else:
                 logger.error(f"Error searching knowledge: {e}", exc_info=True)
+                SOURCE_ERRORS.inc(source="knowledge")
             return []
     
+    async def _search_mode(
+        self,
+        query: str,
+        dataset_names: List[str],
+        top_k: int,
+        search_type: SearchType
+    ) -> List[Any]:
+        """以指定模式执行一次 Cognee 检索，并记录该数据集的命中率与延迟"""
+        mode = "chunks" if search_type == SearchType.CHUNKS else "graph_completion"
+        start = time.perf_counter()
+        try:
+            results = await self.client.search(
+                query=query,
+                datasets=dataset_names,
+                search_type=search_type,
+                top_k=top_k
+            )
+        except Exception:
+            self.policy.record(dataset_names, mode, hit=False, latency=time.perf_counter() - start)
+            raise
+        results = results or []
+        self.policy.record(dataset_names, mode, hit=bool(results), latency=time.perf_counter() - start)
+        return results
+    
+    async def _sequential_search(
+        self,
+        query: str,
+        dataset_names: List[str],
+        top_k: int
+    ) -> Tuple[List[Any], str]:
+        """
+        顺序检索：CHUNKS 为空或失败后再使用 GRAPH_COMPLETION
+        
+        Returns:
+            (原始结果, 命中模式)
+        """
+        # 🎯 性能优化策略：尝试多种搜索模式
+        # 优先使用快速模式，失败则降级到慢速但稳定的模式
+        
+        # 策略1: 先尝试 CHUNKS（快但可能返回空）
+        try:
+            logger.info(f"🚀 尝试 CHUNKS 模式...")
+            results = await self._search_mode(query, dataset_names, top_k, SearchType.CHUNKS)
+            if results:
+                logger.info(f"✅ CHUNKS 模式成功，返回 {len(results)} 条")
+                return results, "chunks"
+            logger.warning(f"⚠️ CHUNKS 模式返回空，降级到 GRAPH_COMPLETION")
+            KNOWLEDGE_FALLBACKS.inc(from_mode="chunks", to_mode="graph_completion", reason="empty")
+        except Exception as e:
+            logger.warning(f"⚠️ CHUNKS 模式失败: {e}，降级到 GRAPH_COMPLETION")
+            KNOWLEDGE_FALLBACKS.inc(from_mode="chunks", to_mode="graph_completion", reason="error")
+        
+        # 策略2: 如果 CHUNKS 失败，使用 GRAPH_COMPLETION
+        logger.info(f"🐌 使用 GRAPH_COMPLETION 模式（较慢但稳定）")
+        results = await self._search_mode(query, dataset_names, top_k, SearchType.GRAPH_COMPLETION)
+        return results, "graph_completion" if results else "none"
+    
+    async def _hedged_search(
+        self,
+        query: str,
+        dataset_names: List[str],
+        top_k: int,
+        delay: float
+    ) -> Tuple[List[Any], str]:
+        """
+        对冲检索：CHUNKS 先行，delay 秒后（或 CHUNKS 提前返回空/失败时）发起
+        GRAPH_COMPLETION，取第一个非空结果并取消另一个
+        
+        Returns:
+            (原始结果, 命中模式)
+        """
+        tasks: Dict[asyncio.Task, str] = {
+            asyncio.create_task(
+                self._search_mode(query, dataset_names, top_k, SearchType.CHUNKS)
+            ): "chunks"
+        }
+        graph_started = False
+        succeeded = False
+        last_error: Optional[Exception] = None
+        try:
+            while tasks:
+                timeout = None if graph_started else delay
+                done, _ = await asyncio.wait(
+                    tasks.keys(),
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    mode = tasks.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.warning(f"⚠️ {mode} 模式失败: {last_error}")
+                        continue
+                    results = task.result()
+                    succeeded = True
+                    if results:
+                        logger.info(f"✅ 对冲检索 {mode} 模式胜出，返回 {len(results)} 条")
+                        return results, mode
+                    logger.warning(f"⚠️ {mode} 模式返回空")
+                if not graph_started:
+                    # CHUNKS 超过 delay 未返回，或已返回空/失败：发起对冲请求
+                    graph_started = True
+                    logger.info(f"🐌 发起对冲 GRAPH_COMPLETION 检索")
+                    tasks[asyncio.create_task(
+                        self._search_mode(query, dataset_names, top_k, SearchType.GRAPH_COMPLETION)
+                    )] = "graph_completion"
+        finally:
+            for task in tasks:
+                task.cancel()
+        if last_error is not None and not succeeded:
+            raise last_error
+        return [], "none"
+    
+    def _parse_results(
+        self,
+        results: List[Any],
+        dataset_names: List[str]
+    ) -> List[Dict[str, Any]]:
+        """解析 Cognee SDK 返回的结果"""
+        knowledge_results = []
+        for i, result in enumerate(results):
+            content = None
+            default_score = 1.0 - (i * 0.1)  # 按顺序递减分数
+            score = default_score
+            
+            if isinstance(result, str):
+                # 字符串格式（GRAPH_COMPLETION 模式）
+                content = result
+            elif hasattr(result, 'text'):
+                # SearchResult 对象格式（CHUNKS 模式）
+                content = result.text
+                # 获取 score，如果是 None 或无效值则使用默认值
+                result_score = getattr(result, 'score', None)
+                score = result_score if result_score is not None else default_score
+                logger.info(f"  📄 CHUNKS 结果 {i+1}: text 长度={len(result.text)}, score={score}")
+            elif hasattr(result, 'content'):
+                # 其他对象格式（备用）
+                content = result.content
+                result_score = getattr(result, 'score', None)
+                score = result_score if result_score is not None else default_score
+            elif isinstance(result, dict):
+                # 字典格式（备用）
+                content = result.get("text") or result.get("content") or str(result)
+                result_score = result.get("score")
+                score = result_score if result_score is not None else default_score
+            
+            if content:
+                knowledge_results.append({
+                    "content": content,
+                    "score": score,
+                    "source": dataset_names[0] if dataset_names else "unknown"
+                })
+            else:
+                logger.warning(f"  ⚠️ 无法解析结果 {i+1}: type={type(result)}, attributes={dir(result)[:10]}")
+        return knowledge_results
+    
     async def close(self):
         """关闭客户端"""
+        await self.policy.flush()
         await self.client.close()
 
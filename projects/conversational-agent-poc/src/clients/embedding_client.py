@@ -0,0 +1,41 @@
+"""文本向量化客户端（OpenAI 兼容 embeddings 接口）"""
+import logging
+from typing import List
+
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingClient:
+    """
+    文本向量化客户端
+
+    本地知识索引的构建与查询必须使用同一个模型，向量才可比较。
+    """
+
+    def __init__(self, openai_client: AsyncOpenAI, model: str, batch_size: int = 64):
+        self.openai = openai_client
+        self.model = model
+        self.batch_size = batch_size
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        批量向量化文本（按 batch_size 分批请求，保持输入顺序）
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            与 texts 一一对应的向量列表
+        """
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            response = await self.openai.embeddings.create(model=self.model, input=batch)
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return vectors
+
+    async def embed_query(self, text: str) -> List[float]:
+        """向量化单条查询文本"""
+        return (await self.embed([text]))[0]
@@ -3,6 +3,7 @@ import asyncio
 from typing import List, Dict, Any, Optional
 import httpx
 from ..config import settings
+from ..metrics import SOURCE_ERRORS
 
 
 class Mem0ClientWrapper:
@@ -25,12 +26,119 @@ class Mem0ClientWrapper:
                 timeout=30.0
             )
             logger.info(f"Mem0 client initialized with URL: {self.base_url}")
+        # 服务器不支持按向量检索（旧版本返回 404）或模型不一致（400）时关闭，之后只用文本检索
+        self.vector_search_enabled = settings.mem0_vector_search
+        # 服务器提供 /api/v1/search/multi 时一次请求完成两个范围的检索，旧服务器返回 404 后关闭
+        self.multi_search_enabled = True
+    
+    async def _search(
+        self,
+        query: str,
+        query_vector: Optional[List[float]] = None,
+        **scope: Optional[str]
+    ) -> httpx.Response:
+        """
+        检索记忆：有查询向量时走 /api/v1/search/vector（服务器跳过向量化），否则走 /api/v1/search
+        
+        Args:
+            query: 查询文本
+            query_vector: 查询向量
+            scope: user_id / agent_id 等过滤条件
+        """
+        if query_vector is not None and self.vector_search_enabled:
+            response = await self.client.post(
+                "/api/v1/search/vector",
+                json={
+                    "vector": query_vector,
+                    "embedding_model": settings.embedding_model,
+                    **scope
+                }
+            )
+            if response.status_code not in (400, 404, 405):
+                return response
+            import logging
+            logging.getLogger(__name__).warning(
+                f"Mem0 vector search unavailable ({response.status_code}: {response.text[:200]}), "
+                f"falling back to text search"
+            )
+            self.vector_search_enabled = False
+        return await self.client.post("/api/v1/search", json={"query": query, **scope})
+    
+    async def _multi_search(
+        self,
+        query: str,
+        query_vector: Optional[List[float]],
+        scopes: Dict[str, Dict[str, Optional[str]]],
+        limits: Dict[str, int]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        多范围检索：一次请求 /api/v1/search/multi，按范围名返回结果
+        
+        Args:
+            query: 查询文本
+            query_vector: 查询向量
+            scopes: {范围名: user_id / agent_id 等过滤条件}
+            limits: {范围名: 返回条数}
+        
+        Returns:
+            {范围名: 结果列表}；服务器不支持该接口时返回 None（之后不再尝试）
+        """
+        payload: Dict[str, Any] = {
+            "query": query,
+            "scopes": [
+                {"name": name, "top_k": limits[name], **scope}
+                for name, scope in scopes.items()
+            ]
+        }
+        if query_vector is not None and self.vector_search_enabled:
+            payload["vector"] = query_vector
+            payload["embedding_model"] = settings.embedding_model
+        response = await self.client.post("/api/v1/search/multi", json=payload)
+        if response.status_code in (404, 405):
+            import logging
+            logging.getLogger(__name__).warning(
+                "Mem0 server has no /api/v1/search/multi, falling back to per-scope search"
+            )
+            self.multi_search_enabled = False
+            return None
+        if response.status_code == 400 and "vector" in payload:
+            # 向量模型与服务器不一致：关闭向量检索，用文本重试
+            import logging
+            logging.getLogger(__name__).warning(
+                f"Mem0 rejected query vector ({response.text[:200]}), falling back to text search"
+            )
+            self.vector_search_enabled = False
+            return await self._multi_search(query, None, scopes, limits)
+        response.raise_for_status()
+        return response.json().get("results", {})
+    
+    @staticmethod
+    def _parse_memories(data: Any, session: str, limit: int) -> List[Dict[str, Any]]:
+        """将 mem0 检索结果转换为上下文记忆（兼容列表、{"results": [...]} 和单个结果）"""
+        if isinstance(data, dict):
+            # 如果是字典，可能是包装格式，否则为单个结果
+            items = data["results"] if "results" in data else [data]
+        elif isinstance(data, list):
+            # mem0 返回的格式：直接是列表，每个元素包含 memory 字段
+            items = data
+        else:
+            return []
+        return [
+            {
+                "content": item.get("memory", item.get("content", str(item))),
+                "type": item.get("memory_type", item.get("type", "semantic")),
+                "session": session,
+                "timestamp": item.get("created_at", item.get("timestamp"))
+            }
+            for item in items[:limit]
+        ]
     
     async def get_conversation_context(
         self,
         user_id: str,
         session_id: str,
-        query: Optional[str] = None
+        query: Optional[str] = None,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         获取会话上下文（并发获取当前会话和跨会话记忆）
@@ -39,6 +147,7 @@ class Mem0ClientWrapper:
             user_id: 用户ID
             session_id: 会话ID
             query: 查询文本
+            query_vector: 查询向量（与 Mem0 服务器使用同一模型时复用，避免两次检索各自向量化）
         
         Returns:
             记忆列表
@@ -47,99 +156,49 @@ class Mem0ClientWrapper:
             return []
         
         try:
-            # 并发获取当前会话记忆和跨会话记忆
-            # mem0 服务器 API: POST /api/v1/search
-            # 注意：如果 agent_id 为空字符串，mem0 可能不会返回结果，所以使用 None
-            current_memories_resp, cross_memories_resp = await asyncio.gather(
-                self.client.post(
-                    "/api/v1/search",
-                    json={
-                        "query": query,
-                        "user_id": user_id,
-                        "agent_id": session_id if session_id else None
-                    }
-                ),
-                self.client.post(
-                    "/api/v1/search",
-                    json={
-                        "query": query,
-                        "user_id": user_id
-                    }
-                ),
-                return_exceptions=True
-            )
-            
-            memories = []
             import logging
             logger = logging.getLogger(__name__)
             
-            # 处理当前会话记忆
-            if isinstance(current_memories_resp, Exception):
-                logger.warning(f"Current session search failed: {current_memories_resp}")
-            elif not isinstance(current_memories_resp, Exception):
-                current_memories_resp.raise_for_status()
-                current_data = current_memories_resp.json()
-                logger.debug(f"Mem0 current session response: {current_data}")
-                # mem0 返回的格式：直接是列表，每个元素包含 memory 字段
-                if isinstance(current_data, list):
-                    for item in current_data[:10]:
-                        memories.append({
-                            "content": item.get("memory", item.get("content", str(item))),
-                            "type": item.get("memory_type", item.get("type", "semantic")),
-                            "session": "current",
-                            "timestamp": item.get("created_at", item.get("timestamp"))
-                        })
-                elif isinstance(current_data, dict):
-                    # 如果是字典，可能是包装格式
-                    if "results" in current_data:
-                        for item in current_data["results"][:10]:
-                            memories.append({
-                                "content": item.get("memory", item.get("content", str(item))),
-                                "type": item.get("memory_type", item.get("type", "semantic")),
-                                "session": "current",
-                                "timestamp": item.get("created_at", item.get("timestamp"))
-                            })
-                    else:
-                        # 单个结果
-                        memories.append({
-                            "content": current_data.get("memory", current_data.get("content", str(current_data))),
-                            "type": current_data.get("memory_type", current_data.get("type", "semantic")),
-                        "session": "current",
-                            "timestamp": current_data.get("created_at", current_data.get("timestamp"))
-                        })
-            
-            logger.debug(f"After processing current session: {len(memories)} memories")
+            # 注意：如果 agent_id 为空字符串，mem0 可能不会返回结果，所以使用 None
+            scopes = {
+                "current": {"user_id": user_id, "agent_id": session_id if session_id else None},
+                "cross": {"user_id": user_id},
+            }
+            limits = {"current": 10, "cross": 5}
+            grouped = None
+            if self.multi_search_enabled:
+                grouped = await self._multi_search(query, query_vector, scopes, limits)
             
-            # 处理跨会话记忆
-            if not isinstance(cross_memories_resp, Exception):
-                cross_memories_resp.raise_for_status()
-                cross_data = cross_memories_resp.json()
-                logger.debug(f"Mem0 cross session response: {cross_data}")
-                if isinstance(cross_data, list):
-                    for item in cross_data[:5]:
-                        memories.append({
-                            "content": item.get("memory", item.get("content", str(item))),
-                            "type": item.get("memory_type", item.get("type", "semantic")),
-                            "session": "cross",
-                            "timestamp": item.get("created_at", item.get("timestamp"))
-                        })
-                elif isinstance(cross_data, dict):
-                    if "results" in cross_data:
-                        for item in cross_data["results"][:5]:
-                            memories.append({
-                                "content": item.get("memory", item.get("content", str(item))),
-                                "type": item.get("memory_type", item.get("type", "semantic")),
-                                "session": "cross",
-                                "timestamp": item.get("created_at", item.get("timestamp"))
-                            })
-                    else:
-                        # 单个结果
-                        memories.append({
-                            "content": cross_data.get("memory", cross_data.get("content", str(cross_data))),
-                            "type": cross_data.get("memory_type", cross_data.get("type", "semantic")),
-                        "session": "cross",
-                            "timestamp": cross_data.get("created_at", cross_data.get("timestamp"))
-                        })
+            memories = []
+            if grouped is not None:
+                # 一次请求：服务器只向量化一次，并发查询各范围
+                for name, limit in limits.items():
+                    memories.extend(self._parse_memories(grouped.get(name), name, limit))
+            else:
+                # 旧服务器：并发获取当前会话记忆和跨会话记忆（POST /api/v1/search）
+                current_memories_resp, cross_memories_resp = await asyncio.gather(
+                    self._search(query, query_vector, **scopes["current"]),
+                    self._search(query, query_vector, **scopes["cross"]),
+                    return_exceptions=True
+                )
+                
+                # 处理当前会话记忆
+                if isinstance(current_memories_resp, Exception):
+                    logger.warning(f"Current session search failed: {current_memories_resp}")
+                else:
+                    current_memories_resp.raise_for_status()
+                    current_data = current_memories_resp.json()
+                    logger.debug(f"Mem0 current session response: {current_data}")
+                    memories.extend(self._parse_memories(current_data, "current", limits["current"]))
+                
+                logger.debug(f"After processing current session: {len(memories)} memories")
+                
+                # 处理跨会话记忆
+                if not isinstance(cross_memories_resp, Exception):
+                    cross_memories_resp.raise_for_status()
+                    cross_data = cross_memories_resp.json()
+                    logger.debug(f"Mem0 cross session response: {cross_data}")
+                    memories.extend(self._parse_memories(cross_data, "cross", limits["cross"]))
             
             logger.debug(f"After processing cross session: {len(memories)} memories")
             
@@ -152,15 +211,50 @@ class Mem0ClientWrapper:
             import logging
             logger = logging.getLogger(__name__)
             logger.error(f"Error getting conversation context: {e}", exc_info=True)
+            SOURCE_ERRORS.inc(source="memories")
             return []
     
+    async def search_batch(self, searches: List[Dict[str, Any]]) -> List[Any]:
+        """
+        批量检索（多查询检索、离线评估等）：一次请求 /api/v1/search/batch，
+        服务器一次向量化全部查询；旧服务器（404）回退为并发的单条检索
+        
+        Args:
+            searches: 检索请求列表，每项包含 query 以及 user_id / agent_id / run_id 等
+        
+        Returns:
+            与 searches 顺序一致的结果列表，每项为 {"results": [...]} 或 {"error": "..."}
+        """
+        if not self.client or not searches:
+            return []
+        response = await self.client.post("/api/v1/search/batch", json={"searches": searches})
+        if response.status_code not in (404, 405):
+            response.raise_for_status()
+            return response.json()["results"]
+        
+        responses = await asyncio.gather(
+            *[self.client.post("/api/v1/search", json=search) for search in searches],
+            return_exceptions=True
+        )
+        results = []
+        for item in responses:
+            if isinstance(item, Exception):
+                results.append({"error": str(item)})
+            elif item.is_error:
+                results.append({"error": item.text})
+            else:
+                data = item.json()
+                results.append(data if isinstance(data, dict) and "results" in data else {"results": data})
+        return results
+    
     async def save_conversation(
         self,
         user_id: str,
         session_id: str,
         messages: List[Dict[str, str]],
-        metadata: Dict[str, Any] = None
-    ) -> None:
+        metadata: Dict[str, Any] = None,
+        raise_errors: bool = False
+    ) -> bool:
         """
         保存会话记忆
         
@@ -169,9 +263,13 @@ class Mem0ClientWrapper:
             session_id: 会话ID
             messages: 消息列表
             metadata: 元数据
+            raise_errors: 失败时是否抛出异常（供 outbox 重试使用）
+        
+        Returns:
+            是否保存成功
         """
         if not self.client:
-            return
+            return False
         
         try:
             # mem0 服务器 API: POST /api/v1/memories
@@ -216,10 +314,15 @@ class Mem0ClientWrapper:
                     logger.warning(f"Mem0 returned error in response: {result.get('error')}")
             except Exception as e:
                 logger.warning(f"Could not parse Mem0 response: {e}")
+            return True
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
             logger.error(f"Error saving conversation: {e}", exc_info=True)
+            SOURCE_ERRORS.inc(source="mem0_write")
+            if raise_errors:
+                raise
+            return False
     
     async def close(self):
         """关闭客户端"""
@@ -3,6 +3,7 @@ import uuid
 from typing import Dict, Any, List
 from memobase import MemoBaseClient, ChatBlob
 from ..config import settings
+from ..metrics import SOURCE_ERRORS
 
 
 def user_id_to_uuid(user_id: str) -> str:
@@ -83,6 +84,7 @@ class MemobaseClientWrapper:
                 logger.debug(f"User {user_id} (UUID: {uuid_user_id}) not found in Memobase (normal for new users)")
             else:
                 logger.warning(f"Error getting user profile for {user_id} (UUID: {uuid_user_id}): {e}")
+                SOURCE_ERRORS.inc(source="profile")
             return {}
     
     def _serialize_profile(self, profile: Any) -> Dict[str, Any]:
@@ -142,14 +144,19 @@ class MemobaseClientWrapper:
     def extract_and_update_profile(
         self,
         user_id: str,
-        messages: List[Dict[str, str]]
-    ) -> None:
+        messages: List[Dict[str, str]],
+        raise_errors: bool = False
+    ) -> bool:
         """
         从对话中提取并更新用户画像
         
         Args:
             user_id: 用户ID（任意字符串，会自动转换为 UUID 格式）
             messages: 对话消息列表
+            raise_errors: 失败时是否抛出异常（供 outbox 重试使用）
+        
+        Returns:
+            画像是否已更新
         """
         # 将 user_id 转换为 UUID 格式（Memobase API 要求）
         uuid_user_id = user_id_to_uuid(user_id)
@@ -183,6 +190,8 @@ class MemobaseClientWrapper:
                 blob = ChatBlob(messages=messages)
                 user.insert(blob)
                 user.flush()
+                return True
+            return False
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
@@ -192,5 +201,9 @@ class MemobaseClientWrapper:
                 logger.warning(f"Memobase operation failed for user {user_id} (UUID: {uuid_user_id}): {error_msg}")
             else:
                 logger.warning(f"Error updating user profile in Memobase for user {user_id} (UUID: {uuid_user_id}): {e}")
-            # 不抛出异常，允许系统继续运行
+            SOURCE_ERRORS.inc(source="memobase_write")
+            if raise_errors:
+                raise
+            # 默认不抛出异常，允许系统继续运行
+            return False
 
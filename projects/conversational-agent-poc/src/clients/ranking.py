@@ -0,0 +1,94 @@
+"""多数据集检索结果融合"""
+import re
+from typing import Any, Dict, List, Set
+
+# 去重时忽略标点和空白（\w 在 Unicode 模式下包含中文字符）
+_NON_WORD = re.compile(r"\W+")
+
+
+def normalize_text(text: str) -> str:
+    """归一化文本用于去重：小写、去掉标点和空白"""
+    return _NON_WORD.sub("", text.lower())
+
+
+def _shingles(text: str, size: int = 3) -> Set[str]:
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[Dict[str, Any]]],
+    top_k: int,
+    k: int = 60,
+    dedup_threshold: float = 0.9
+) -> List[Dict[str, Any]]:
+    """
+    使用 reciprocal-rank fusion 合并各数据集的检索结果
+
+    每个列表内先按分数排序（分数在列表内做 min-max 归一化，仅用于同 RRF 分数时的排序），
+    每条结果贡献 1 / (k + rank)。字符 3-gram Jaccard 相似度 >= dedup_threshold 的结果视为
+    同一片段：RRF 分数累加，sources 记录所有出处，内容保留首个出现的版本。
+
+    Args:
+        result_lists: 各数据集的结果列表，元素包含 content、score、source
+        top_k: 返回结果数量
+        k: RRF 平滑常数
+        dedup_threshold: 近似重复判定阈值
+
+    Returns:
+        融合后的结果，score 为归一化到 [0, 1] 的融合分数
+    """
+    merged: List[Dict[str, Any]] = []
+    signatures: List[Set[str]] = []
+
+    for results in result_lists:
+        if not results:
+            continue
+        ranked = sorted(results, key=lambda item: item.get("score") or 0.0, reverse=True)
+        scores = [item.get("score") or 0.0 for item in ranked]
+        low, high = min(scores), max(scores)
+        for rank, item in enumerate(ranked, start=1):
+            normalized = (scores[rank - 1] - low) / (high - low) if high > low else 1.0
+            signature = _shingles(normalize_text(item.get("content", "")))
+            contribution = 1.0 / (k + rank)
+
+            duplicate = None
+            for index, existing in enumerate(signatures):
+                if _jaccard(signature, existing) >= dedup_threshold:
+                    duplicate = merged[index]
+                    break
+
+            if duplicate is None:
+                merged.append({
+                    "content": item.get("content", ""),
+                    "source": item.get("source", "unknown"),
+                    "sources": [item.get("source", "unknown")],
+                    "rrf": contribution,
+                    "normalized_score": normalized,
+                })
+                signatures.append(signature)
+            else:
+                duplicate["rrf"] += contribution
+                duplicate["normalized_score"] = max(duplicate["normalized_score"], normalized)
+                if item.get("source") not in duplicate["sources"]:
+                    duplicate["sources"].append(item.get("source", "unknown"))
+
+    merged.sort(key=lambda item: (item["rrf"], item["normalized_score"]), reverse=True)
+    top = merged[:top_k]
+    best = top[0]["rrf"] if top else 1.0
+    return [
+        {
+            "content": item["content"],
+            "score": round(item["rrf"] / best, 4),
+            "source": item["source"],
+            "sources": item["sources"],
+        }
+        for item in top
+    ]
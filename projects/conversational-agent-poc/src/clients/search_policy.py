@@ -0,0 +1,247 @@
+"""Cognee 检索模式自适应策略"""
+import asyncio
+import copy
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODES = ("chunks", "graph_completion")
+
+
+class AdaptiveSearchPolicy:
+    """
+    按数据集统计 CHUNKS / GRAPH_COMPLETION 的命中率与延迟（指数滑动平均），
+    并据此预先选择检索策略：
+
+    - CHUNKS 样本不足：sequential（先 CHUNKS，继续收集统计）
+    - 两种模式样本都足够：按统计估算 sequential / hedged / graph_only 的预期命中率与延迟，
+      在命中率不低于最佳值 hit_rate_tolerance 以内的策略中选预期延迟最低的；
+      按 sequential、hedged、graph_only 的顺序，后者需快 latency_margin（比例）以上才替换前者，
+      避免为微小收益增加并发请求
+    - 只有 CHUNKS 样本（CHUNKS 几乎总命中时很少回退）：按 CHUNKS 命中率阈值选择，
+      < low_hit_rate 为 graph_only，>= high_hit_rate 为 sequential，其余 hedged
+    - 选中 graph_only 时以 explore_rate 的概率仍走 sequential，以便发现数据集变化
+
+    hedged 的对冲等待时间取 CHUNKS 延迟的 1.5 倍（不超过默认值）。
+    统计保存在 JSON 文件中，重启后继续使用；写文件在线程中执行，不阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        alpha: float = 0.2,
+        min_samples: int = 5,
+        low_hit_rate: float = 0.1,
+        high_hit_rate: float = 0.8,
+        explore_rate: float = 0.05,
+        hit_rate_tolerance: float = 0.05,
+        latency_margin: float = 0.1,
+        default_hedge_delay: float = 1.5,
+        save_every: int = 20
+    ):
+        self.path = path
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.low_hit_rate = low_hit_rate
+        self.high_hit_rate = high_hit_rate
+        self.explore_rate = explore_rate
+        self.hit_rate_tolerance = hit_rate_tolerance
+        self.latency_margin = latency_margin
+        self.default_hedge_delay = default_hedge_delay
+        self.save_every = save_every
+        self._stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._unsaved = 0
+        self._saves: Set[asyncio.Future] = set()
+        self._write_lock = threading.Lock()
+        # 快照序号：并发写入时较旧的快照不会覆盖较新的
+        self._snapshot_seq = 0
+        self._written_seq = 0
+        self.load()
+
+    @staticmethod
+    def dataset_key(dataset_names: List[str]) -> str:
+        """数据集组合的统计键（与顺序无关）"""
+        return "|".join(sorted(dataset_names))
+
+    def record(self, dataset_names: List[str], mode: str, hit: bool, latency: float) -> None:
+        """记录一次检索结果（被取消的检索不应记录）"""
+        entry = self._stats.setdefault(self.dataset_key(dataset_names), {})
+        stats = entry.get(mode)
+        if stats is None:
+            entry[mode] = {
+                "samples": 1,
+                "hit_rate": 1.0 if hit else 0.0,
+                "latency": latency,
+                "updated_at": time.time(),
+            }
+        else:
+            stats["samples"] += 1
+            stats["hit_rate"] += self.alpha * ((1.0 if hit else 0.0) - stats["hit_rate"])
+            stats["latency"] += self.alpha * (latency - stats["latency"])
+            stats["updated_at"] = time.time()
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self._schedule_save()
+
+    def choose(self, dataset_names: List[str], explore: bool = True) -> str:
+        """
+        为数据集组合选择检索策略：sequential | hedged | graph_only
+
+        Args:
+            dataset_names: 数据集名称列表
+            explore: 是否按 explore_rate 随机探索（调试展示时关闭）
+        """
+        entry = self._stats.get(self.dataset_key(dataset_names), {})
+        chunks = entry.get("chunks")
+        graph = entry.get("graph_completion")
+        if chunks is None or chunks["samples"] < self.min_samples:
+            return "sequential"
+        if graph is not None and graph["samples"] >= self.min_samples:
+            expected = self.expected(dataset_names)
+            best_hit_rate = max(hit_rate for hit_rate, _ in expected.values())
+            strategy, best_latency = None, 0.0
+            for name, (hit_rate, latency) in expected.items():
+                if hit_rate < best_hit_rate - self.hit_rate_tolerance:
+                    continue
+                if strategy is None or latency < best_latency * (1.0 - self.latency_margin):
+                    strategy, best_latency = name, latency
+        elif chunks["hit_rate"] < self.low_hit_rate:
+            strategy = "graph_only"
+        elif chunks["hit_rate"] >= self.high_hit_rate:
+            strategy = "sequential"
+        else:
+            strategy = "hedged"
+        if strategy == "graph_only" and explore and random.random() < self.explore_rate:
+            return "sequential"
+        return strategy
+
+    def expected(self, dataset_names: List[str]) -> Dict[str, Tuple[float, float]]:
+        """
+        由统计估算各策略的（预期命中率, 预期延迟），按选择时的优先顺序排列
+
+        - sequential：CHUNKS 延迟 + CHUNKS 未命中时的 GRAPH_COMPLETION 延迟
+        - hedged：CHUNKS 命中时为 CHUNKS 延迟，否则为 min(CHUNKS 延迟, 等待时间) + GRAPH_COMPLETION 延迟
+        - graph_only：GRAPH_COMPLETION 的命中率与延迟
+
+        调用前需两种模式都有统计。
+        """
+        entry = self._stats[self.dataset_key(dataset_names)]
+        chunks_hit, chunks_latency = entry["chunks"]["hit_rate"], entry["chunks"]["latency"]
+        graph_hit, graph_latency = entry["graph_completion"]["hit_rate"], entry["graph_completion"]["latency"]
+        either_hit = 1.0 - (1.0 - chunks_hit) * (1.0 - graph_hit)
+        delay = self.hedge_delay(dataset_names, self.default_hedge_delay)
+        return {
+            "sequential": (either_hit, chunks_latency + (1.0 - chunks_hit) * graph_latency),
+            "hedged": (
+                either_hit,
+                chunks_hit * chunks_latency + (1.0 - chunks_hit) * (min(chunks_latency, delay) + graph_latency)
+            ),
+            "graph_only": (graph_hit, graph_latency),
+        }
+
+    def hedge_delay(self, dataset_names: List[str], default: float) -> float:
+        """hedged 策略的等待时间：略大于 CHUNKS 的典型延迟，不超过 default"""
+        chunks = self._stats.get(self.dataset_key(dataset_names), {}).get("chunks")
+        if chunks is None:
+            return default
+        return min(default, chunks["latency"] * 1.5)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前统计与各数据集组合的决策（供调试接口使用）"""
+        datasets = {}
+        for key, entry in self._stats.items():
+            names = key.split("|")
+            datasets[key] = {
+                "strategy": self.choose(names, explore=False),
+                "expected": {
+                    strategy: {"hit_rate": round(hit_rate, 3), "latency": round(latency, 3)}
+                    for strategy, (hit_rate, latency) in self.expected(names).items()
+                } if all(mode in entry for mode in MODES) else None,
+                "modes": {
+                    mode: {
+                        "samples": int(stats["samples"]),
+                        "hit_rate": round(stats["hit_rate"], 3),
+                        "latency": round(stats["latency"], 3),
+                    }
+                    for mode, stats in entry.items()
+                },
+            }
+        return {
+            "path": self.path,
+            "min_samples": self.min_samples,
+            "low_hit_rate": self.low_hit_rate,
+            "high_hit_rate": self.high_hit_rate,
+            "explore_rate": self.explore_rate,
+            "hit_rate_tolerance": self.hit_rate_tolerance,
+            "latency_margin": self.latency_margin,
+            "datasets": datasets,
+        }
+
+    def load(self) -> None:
+        """从文件加载统计（文件不存在或损坏时从空开始）"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._stats = {
+                key: {mode: stats for mode, stats in entry.items() if mode in MODES}
+                for key, entry in data.get("datasets", {}).items()
+            }
+            logger.info(f"Loaded Cognee search policy for {len(self._stats)} dataset groups from {self.path}")
+        except Exception as e:
+            logger.warning(f"Failed to load Cognee search policy from {self.path}: {e}")
+
+    def _schedule_save(self) -> None:
+        """在线程中写入当前统计的快照（没有运行中的事件循环时直接写入）"""
+        self._unsaved = 0
+        if not self.path:
+            return
+        snapshot = self._snapshot()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(*snapshot)
+            return
+        task = asyncio.ensure_future(asyncio.to_thread(self._write, *snapshot))
+        self._saves.add(task)
+        task.add_done_callback(self._saves.discard)
+
+    async def flush(self) -> None:
+        """等待进行中的写入后写入最新统计（关闭时调用）"""
+        if self._saves:
+            await asyncio.gather(*self._saves, return_exceptions=True)
+        await asyncio.to_thread(self.save)
+
+    def save(self) -> None:
+        """同步写入统计文件"""
+        self._unsaved = 0
+        if self.path:
+            self._write(*self._snapshot())
+
+    def _snapshot(self) -> Tuple[int, Dict[str, Dict[str, Dict[str, float]]]]:
+        self._snapshot_seq += 1
+        return self._snapshot_seq, copy.deepcopy(self._stats)
+
+    def _write(self, seq: int, stats: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+        """原子写入统计文件（跳过比已写入的更旧的快照）"""
+        try:
+            with self._write_lock:
+                if seq <= self._written_seq:
+                    return
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"datasets": stats}, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.path)
+                self._written_seq = seq
+        except Exception as e:
+            logger.warning(f"Failed to save Cognee search policy to {self.path}: {e}")
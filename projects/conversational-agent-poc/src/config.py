@@ -14,6 +14,14 @@ class Settings(BaseSettings):
     # Cognee
     cognee_api_url: str = "http://localhost:8000"
     cognee_api_token: Optional[str] = None
+    # 检索策略：sequential | hedged | parallel | adaptive
+    cognee_search_strategy: str = "sequential"
+    # hedged 模式下 CHUNKS 先行的等待时间（秒），超过后并行发起 GRAPH_COMPLETION
+    cognee_hedge_delay: float = 1.5
+    # 多个数据集时是否按数据集分别并发检索，并用 RRF 融合排序（保留每条结果的真实来源）
+    cognee_dataset_fanout: bool = False
+    # 各数据集检索模式统计的持久化文件（adaptive 策略使用）
+    cognee_policy_path: Optional[str] = "data/cognee_search_policy.json"
     
     # Memobase
     memobase_project_url: str = "http://localhost:8019"
@@ -23,6 +31,58 @@ class Settings(BaseSettings):
     mem0_api_url: str = "http://localhost:8888"
     mem0_api_key: Optional[str] = None
     
+    # 检索截止时间（秒）：整体预算 + 各来源预算，None 表示不限制
+    # 超时的来源会被取消，Prompt 使用已返回的部分上下文构建
+    # 整体预算需覆盖最慢的来源（Cognee 检索约 13 秒），否则每轮都会丢弃知识
+    retrieval_timeout: Optional[float] = 15.0
+    profile_timeout: Optional[float] = None
+    memory_timeout: Optional[float] = None
+    knowledge_timeout: Optional[float] = None
+    
+    # 会话上下文缓存（TTL 秒 + LRU 容量）
+    profile_cache_enabled: bool = True
+    profile_cache_ttl: float = 300.0
+    profile_cache_maxsize: int = 1000
+    memory_cache_enabled: bool = False
+    memory_cache_ttl: float = 60.0
+    memory_cache_maxsize: int = 1000
+    
+    # 知识检索结果缓存：内存 LRU + SQLite（路径置空时只用内存）
+    # 数据集版本存于 SQLite，各 worker 每 knowledge_cache_version_refresh 秒重新读取；
+    # 只用内存时版本仅在本进程内有效，需逐个进程调用失效接口
+    knowledge_cache_enabled: bool = True
+    knowledge_cache_ttl: float = 3600.0
+    knowledge_cache_maxsize: int = 2000
+    knowledge_cache_db_path: Optional[str] = "data/knowledge_cache.db"
+    knowledge_cache_version_refresh: float = 5.0
+    
+    # 本地知识向量索引（Cognee DocumentChunk 的镜像，由 sync_knowledge_index.py 构建）
+    # 索引覆盖所查数据集时先在进程内做余弦 top-k，无结果或失败时回退 Cognee
+    knowledge_index_enabled: bool = False
+    knowledge_index_dir: str = "data/knowledge_index"
+    knowledge_index_min_score: float = 0.3
+    embedding_model: str = "text-embedding-3-small"
+    
+    # 查询向量：每轮对话只向量化一次（按文本哈希缓存），本地知识索引与 Mem0 按向量检索共用
+    query_embedding_cache_ttl: float = 600.0
+    query_embedding_cache_maxsize: int = 2000
+    # Mem0 按向量检索（/api/v1/search/vector），要求 Mem0 服务器的 EMBEDDING_MODEL 与 embedding_model 一致
+    mem0_vector_search: bool = False
+    
+    # 后台写入队列（会话记忆与用户画像保存）
+    write_queue_maxsize: int = 1000
+    write_queue_workers: int = 4
+    write_queue_put_timeout: Optional[float] = 1.0
+    write_queue_drain_timeout: Optional[float] = 30.0
+    mem0_write_concurrency: int = 4
+    memobase_write_concurrency: int = 2
+    
+    # 持久化写入 outbox（SQLite WAL），关闭时直接走写入队列
+    outbox_enabled: bool = True
+    outbox_path: str = "data/outbox.db"
+    outbox_max_attempts: int = 8
+    outbox_poll_interval: float = 1.0
+    
     # 应用配置
     app_host: str = "0.0.0.0"
     app_port: int = 8080
@@ -1,13 +1,16 @@
 """FastAPI 应用主入口"""
+import json
 import logging
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 from openai import AsyncOpenAI
 
 from .config import settings
+from .metrics import render_metrics, WRITE_QUEUE_DEPTH
 from .clients import CogneeClientWrapper, MemobaseClientWrapper, Mem0ClientWrapper
 from .services import ConversationEngine
 
@@ -54,6 +57,7 @@ async def lifespan(app: FastAPI):
         memobase_client=memobase_client,
         mem0_client=mem0_client
     )
+    await conversation_engine.start()
     
     logger.info("Services initialized successfully")
     
@@ -61,6 +65,7 @@ async def lifespan(app: FastAPI):
     
     # 关闭时清理
     logger.info("Shutting down services...")
+    await conversation_engine.shutdown()
     await cognee_client.close()
     await mem0_client.close()
     logger.info("Services shut down successfully")
@@ -83,6 +88,7 @@ class MessageRequest(BaseModel):
     session_id: str
     dataset_names: Optional[List[str]] = None
     role: str = "default"  # 角色：default 或 psychology_counselor
+    include_timings: bool = False  # 是否在响应体中返回各阶段耗时
 
 
 class TestRequest(BaseModel):
@@ -94,6 +100,24 @@ class TestRequest(BaseModel):
     role: str = "default"  # 角色：default 或 psychology_counselor
 
 
+def _timed_json_response(content: Dict[str, Any], timings: Dict[str, float]) -> JSONResponse:
+    """
+    构建 JSON 响应，并附加 Server-Timing 头
+    
+    Server-Timing 中包含各阶段耗时以及响应序列化耗时（毫秒），
+    浏览器 devtools 和压测工具可以直接按阶段归因延迟。
+    """
+    serialize_start = time.perf_counter()
+    response = JSONResponse(content=content)
+    serialization = time.perf_counter() - serialize_start
+    entries = [
+        f"{stage};dur={seconds * 1000:.1f}"
+        for stage, seconds in {**timings, "serialization": serialization}.items()
+    ]
+    response.headers["Server-Timing"] = ", ".join(entries)
+    return response
+
+
 # API 端点
 @app.get("/")
 async def root():
@@ -111,6 +135,14 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 指标"""
+    if conversation_engine:
+        WRITE_QUEUE_DEPTH.set(conversation_engine.write_queue.stats()["depth"])
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/api/v1/conversations/{session_id}/messages")
 async def send_message(
     session_id: str,
@@ -135,21 +167,73 @@ async def send_message(
             role=request.role
         )
         
-        return JSONResponse(content={
+        content = {
             "success": True,
             "session_id": session_id,
             "response": result["response"],
             "timestamp": "2024-01-01T00:00:00Z"
-        })
+        }
+        if request.include_timings:
+            content["timings"] = result["timings"]
+        return _timed_json_response(content, result["timings"])
     except Exception as e:
         logger.error(f"Error processing message: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """将事件编码为 SSE 帧"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/v1/conversations/{session_id}/messages/stream")
+async def send_message_stream(
+    session_id: str,
+    request: MessageRequest
+):
+    """
+    发送消息并以 SSE 流式获取响应
+    
+    事件类型：
+    - token: LLM 增量内容 {"content": "..."}
+    - error: LLM 调用出错 {"detail": "..."}
+    - done: 完整回复、上下文摘要和各阶段耗时
+    
+    Args:
+        session_id: 会话ID
+        request: 消息请求
+    """
+    if not conversation_engine:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+    
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for item in conversation_engine.process_message_stream(
+                user_id=request.user_id,
+                session_id=session_id,
+                message=request.message,
+                dataset_names=request.dataset_names,
+                role=request.role
+            ):
+                yield _format_sse(item["event"], item["data"])
+        except Exception as e:
+            logger.error(f"Error streaming message: {e}", exc_info=True)
+            yield _format_sse("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # 禁用反向代理缓冲，确保 token 立即下发
+        }
+    )
+
+
 @app.post("/api/v1/test/conversation")
 async def test_conversation(request: TestRequest):
     """
-    测试对话接口（返回完整上下文信息）
+    测试对话接口（返回完整上下文信息和各阶段耗时）
     
     Args:
         request: 测试请求
@@ -168,16 +252,17 @@ async def test_conversation(request: TestRequest):
             role=request.role
         )
         
-        return JSONResponse(content={
+        return _timed_json_response({
             "success": True,
             "user_id": request.user_id,
             "session_id": session_id,
             "message": request.message,
             "response": result["response"],
             "context": result["context"],
+            "timings": result["timings"],
             "dataset_names": request.dataset_names,
             "role": request.role
-        })
+        }, result["timings"])
     except Exception as e:
         logger.error(f"Error in test conversation: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -208,6 +293,26 @@ async def get_user_profile(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/knowledge/datasets/{dataset_name}/invalidate")
+async def invalidate_knowledge_dataset(dataset_name: str):
+    """
+    数据集重新 cognify 后调用，使该数据集的知识检索缓存失效
+    
+    Args:
+        dataset_name: 数据集名称
+    """
+    if not conversation_engine:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+    
+    version = conversation_engine.knowledge_service.invalidate_dataset(dataset_name)
+    return JSONResponse(content={
+        "success": True,
+        "dataset_name": dataset_name,
+        "cache_enabled": version is not None,
+        "version": version
+    })
+
+
 @app.get("/api/v1/debug/status")
 async def debug_status():
     """
@@ -235,10 +340,46 @@ async def debug_status():
                 "model": settings.openai_model,
                 "base_url": settings.openai_base_url or "default"
             }
+        },
+        "write_queue": conversation_engine.write_queue.stats(),
+        "outbox": conversation_engine.outbox.stats() if conversation_engine.outbox else None,
+        "caches": {
+            "profile": conversation_engine.profile_service.cache.stats()
+            if conversation_engine.profile_service.cache else None,
+            "memory": conversation_engine.memory_service.cache.stats()
+            if conversation_engine.memory_service.cache else None,
+            "knowledge": conversation_engine.knowledge_service.cache.stats()
+            if conversation_engine.knowledge_service.cache else None,
+            "query_embedding": conversation_engine.embedding_service.cache.stats()
+            if conversation_engine.embedding_service else None
+        },
+        "knowledge_index": conversation_engine.knowledge_service.index.stats()
+        if conversation_engine.knowledge_service.index else None,
+        "singleflight": {
+            "knowledge": conversation_engine.knowledge_service.flight.stats(),
+            "embedding": conversation_engine.embedding_service.flight.stats()
+            if conversation_engine.embedding_service else None,
+            "memories": conversation_engine.memory_service.flight.stats(),
+            "profile": conversation_engine.profile_service.flight.stats()
         }
     })
 
 
+@app.get("/api/v1/debug/knowledge-policy")
+async def debug_knowledge_policy():
+    """
+    调试接口：查看 Cognee 各数据集的检索模式统计和自适应策略决策
+    """
+    if not conversation_engine:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+    
+    return JSONResponse(content={
+        "success": True,
+        "strategy": settings.cognee_search_strategy,
+        "policy": conversation_engine.knowledge_service.cognee.policy.snapshot()
+    })
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
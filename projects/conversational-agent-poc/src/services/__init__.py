@@ -1,13 +1,27 @@
 """服务模块"""
+from .cache import TTLCache
+from .singleflight import SingleFlight
+from .embedding_service import EmbeddingService
+from .knowledge_cache import KnowledgeCache
+from .vector_index import LocalVectorIndex
 from .knowledge_service import KnowledgeService
 from .profile_service import ProfileService
 from .memory_service import MemoryService
+from .write_queue import BackgroundWriteQueue
+from .outbox import WriteOutbox
 from .conversation_engine import ConversationEngine
 
 __all__ = [
+    "TTLCache",
+    "SingleFlight",
+    "EmbeddingService",
+    "KnowledgeCache",
+    "LocalVectorIndex",
     "KnowledgeService",
     "ProfileService",
     "MemoryService",
+    "BackgroundWriteQueue",
+    "WriteOutbox",
     "ConversationEngine",
 ]
 
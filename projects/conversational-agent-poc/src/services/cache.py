@@ -0,0 +1,122 @@
+"""进程内 TTL + LRU 缓存"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    带过期时间的 LRU 缓存
+
+    - 超过 maxsize 时淘汰最久未使用的条目
+    - 条目在 ttl 秒后过期（读取时惰性清理）
+    - 键为元组时支持按前缀失效（例如按 user_id 失效该用户的所有条目）
+    - 每次按前缀失效递增该前缀的代数，失效前发起的回填可据此被拒绝
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[Tuple[Any, ...], int] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "stale_fills": 0,
+        }
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取条目，未命中或已过期时返回 default"""
+        entry = self._data.get(key, self._MISSING)
+        if entry is self._MISSING:
+            self._stats["misses"] += 1
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self._stats["misses"] += 1
+            return default
+        self._data.move_to_end(key)
+        self._stats["hits"] += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入条目"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def set_if_current(
+        self,
+        key: Hashable,
+        value: Any,
+        prefix: Tuple[Any, ...],
+        generation: int,
+        ttl: Optional[float] = None
+    ) -> bool:
+        """
+        仅当 prefix 自读取 generation 以来未被失效时写入
+
+        用于回填：读取开始前记下 generation(prefix)，期间若发生写入并失效，
+        读到的旧值不再写回缓存。
+
+        Returns:
+            是否写入
+        """
+        if self.generation(prefix) != generation:
+            self._stats["stale_fills"] += 1
+            return False
+        self.set(key, value, ttl=ttl)
+        return True
+
+    def generation(self, prefix: Tuple[Any, ...]) -> int:
+        """前缀的失效代数（每次 invalidate_prefix 加一）"""
+        return self._generations.get(prefix, 0)
+
+    def invalidate(self, key: Hashable) -> None:
+        """删除单个条目"""
+        if self._data.pop(key, self._MISSING) is not self._MISSING:
+            self._stats["invalidations"] += 1
+
+    def invalidate_prefix(self, prefix: Tuple[Any, ...]) -> int:
+        """
+        删除所有以 prefix 开头的元组键
+
+        Returns:
+            删除的条目数
+        """
+        self._generations[prefix] = self._generations.get(prefix, 0) + 1
+        size = len(prefix)
+        keys = [
+            key for key in self._data
+            if isinstance(key, tuple) and key[:size] == prefix
+        ]
+        for key in keys:
+            del self._data[key]
+        self._stats["invalidations"] += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存指标"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hit_ratio": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
@@ -1,16 +1,46 @@
 """对话处理引擎"""
 import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable
 from openai import AsyncOpenAI
 from ..config import settings
-from ..clients import CogneeClientWrapper, MemobaseClientWrapper, Mem0ClientWrapper
-from ..services import KnowledgeService, ProfileService, MemoryService
+from ..metrics import (
+    STAGE_SECONDS,
+    BACKGROUND_WRITE_SECONDS,
+    SOURCE_ERRORS,
+    RETRIEVAL_DROPPED,
+)
+from ..clients import CogneeClientWrapper, MemobaseClientWrapper, Mem0ClientWrapper, EmbeddingClient
+from ..services import (
+    KnowledgeService,
+    ProfileService,
+    MemoryService,
+    BackgroundWriteQueue,
+    WriteOutbox,
+    TTLCache,
+    KnowledgeCache,
+    LocalVectorIndex,
+    EmbeddingService,
+)
 from ..prompts.templates import build_conversation_prompt, get_system_prompt
 
 logger = logging.getLogger(__name__)
 
+# LLM 调用失败时返回给用户的兜底回复
+FALLBACK_RESPONSE = "抱歉，我遇到了一些问题，请稍后再试。"
+
+# 来源超时（或被取消）时的上下文状态说明
+DROPPED_STATUS = "检索超时，已跳过"
+
+# 检索来源 -> 阶段指标名
+SOURCE_STAGES = {
+    "profile": "profile_fetch",
+    "memories": "mem0_search",
+    "knowledge": "cognee_search",
+}
+
 
 class ConversationEngine:
     """对话处理引擎"""
@@ -23,9 +53,77 @@ class ConversationEngine:
         mem0_client: Mem0ClientWrapper
     ):
         self.openai = openai_client
-        self.knowledge_service = KnowledgeService(cognee_client)
-        self.profile_service = ProfileService(memobase_client)
-        self.memory_service = MemoryService(mem0_client)
+        # 查询向量只计算一次：本地知识索引与 Mem0 按向量检索共用（按文本哈希缓存）
+        self.embedding_service: Optional[EmbeddingService] = None
+        if settings.knowledge_index_enabled or settings.mem0_vector_search:
+            self.embedding_service = EmbeddingService(
+                EmbeddingClient(openai_client, settings.embedding_model),
+                cache=TTLCache(
+                    maxsize=settings.query_embedding_cache_maxsize,
+                    ttl=settings.query_embedding_cache_ttl
+                )
+            )
+        self.knowledge_service = KnowledgeService(
+            cognee_client,
+            cache=KnowledgeCache(
+                maxsize=settings.knowledge_cache_maxsize,
+                ttl=settings.knowledge_cache_ttl,
+                db_path=settings.knowledge_cache_db_path,
+                version_refresh=settings.knowledge_cache_version_refresh
+            ) if settings.knowledge_cache_enabled else None,
+            index=LocalVectorIndex(settings.knowledge_index_dir)
+            if settings.knowledge_index_enabled else None,
+            embedder=self.embedding_service
+        )
+        self.profile_service = ProfileService(
+            memobase_client,
+            cache=TTLCache(
+                maxsize=settings.profile_cache_maxsize,
+                ttl=settings.profile_cache_ttl
+            ) if settings.profile_cache_enabled else None
+        )
+        self.memory_service = MemoryService(
+            mem0_client,
+            cache=TTLCache(
+                maxsize=settings.memory_cache_maxsize,
+                ttl=settings.memory_cache_ttl
+            ) if settings.memory_cache_enabled else None
+        )
+        self.write_queue = BackgroundWriteQueue(
+            maxsize=settings.write_queue_maxsize,
+            workers=settings.write_queue_workers,
+            backend_limits={
+                "mem0": settings.mem0_write_concurrency,
+                "memobase": settings.memobase_write_concurrency,
+            },
+            put_timeout=settings.write_queue_put_timeout
+        )
+        self.outbox: Optional[WriteOutbox] = None
+        if settings.outbox_enabled:
+            self.outbox = WriteOutbox(
+                path=settings.outbox_path,
+                max_attempts=settings.outbox_max_attempts,
+                poll_interval=settings.outbox_poll_interval
+            )
+            self.outbox.register("mem0.save_conversation", self._deliver_memory)
+            self.outbox.register("memobase.update_profile", self._deliver_profile)
+    
+    async def start(self) -> None:
+        """启动后台写入队列和 outbox 投递"""
+        await self.write_queue.start()
+        if self.outbox:
+            self.outbox.open()
+            await self.outbox.start(self.write_queue.submit)
+    
+    async def shutdown(self) -> None:
+        """停止 outbox 轮询、排空后台写入队列并关闭本地存储（在关闭客户端之前调用）"""
+        if self.outbox:
+            await self.outbox.stop()
+        await self.write_queue.drain(timeout=settings.write_queue_drain_timeout)
+        if self.outbox:
+            self.outbox.close()
+        if self.knowledge_service.cache:
+            self.knowledge_service.cache.close()
     
     async def process_message(
         self,
@@ -45,40 +143,298 @@ class ConversationEngine:
             dataset_names: 知识库数据集名称列表
         
         Returns:
-            包含响应和上下文的字典
+            包含响应、上下文和各阶段耗时（秒）的字典
         """
-        # 步骤 1-3：并发获取上下文（🚀 已优化性能）
-        import time
-        start_time = time.time()
-        retrieval_start = time.time()
+        with STAGE_SECONDS.time(stage="total") as total_timer:
+            # 步骤 1-3：并发获取上下文（🚀 已优化性能）
+            retrieved = await self._retrieve_context(
+                user_id=user_id,
+                session_id=session_id,
+                message=message,
+                dataset_names=dataset_names
+            )
+            
+            # 步骤 4：构建 Prompt
+            with STAGE_SECONDS.time(stage="prompt_build") as prompt_timer:
+                prompt = build_conversation_prompt(
+                    user_profile=retrieved["user_profile"],
+                    session_memories=retrieved["session_memories"],
+                    knowledge=retrieved["knowledge_results"],
+                    user_message=message
+                )
+            
+            # 步骤 5：调用 OpenAI API
+            with STAGE_SECONDS.time(stage="llm_generation") as llm_timer:
+                try:
+                    response = await self.openai.chat.completions.create(
+                        **self._build_completion_kwargs(prompt, role)
+                    )
+                    ai_response = response.choices[0].message.content
+                except Exception as e:
+                    logger.error(f"OpenAI API error: {e}")
+                    SOURCE_ERRORS.inc(source="llm")
+                    ai_response = FALLBACK_RESPONSE
+            logger.info(f"⚡ LLM生成耗时: {llm_timer.elapsed:.2f}秒")
+            
+            # 步骤 6-7：异步保存（不阻塞响应）
+            await self._schedule_save(
+                user_id=user_id,
+                session_id=session_id,
+                user_message=message,
+                ai_response=ai_response,
+                dataset_names=dataset_names
+            )
         
-        user_profile, session_memories, knowledge_results = await asyncio.gather(
-            self.profile_service.get_user_profile(user_id=user_id, max_token_size=300),  # 🚀 减少token
-            self.memory_service.get_conversation_context(
+        # 总耗时
+        retrieval_time = retrieved["retrieval_time"]
+        logger.info(
+            f"🎯 对话总耗时: {total_timer.elapsed:.2f}秒 "
+            f"(检索: {retrieval_time:.2f}s + LLM: {llm_timer.elapsed:.2f}s)"
+        )
+        
+        timings = self._build_timings(
+            retrieved,
+            prompt_build=prompt_timer.elapsed,
+            llm_generation=llm_timer.elapsed,
+            total=total_timer.elapsed
+        )
+        
+        # 返回响应、上下文信息和各阶段耗时（用于测试和调试）
+        return {
+            "response": ai_response,
+            "context": self._build_context(retrieved),
+            "timings": timings
+        }
+    
+    async def process_message_stream(
+        self,
+        user_id: str,
+        session_id: str,
+        message: str,
+        dataset_names: Optional[List[str]] = None,
+        role: str = "default"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式处理用户消息，逐个产出 LLM token
+        
+        检索阶段与 process_message 相同；LLM 以 stream=True 调用，
+        每个增量内容产出一个 token 事件，最后产出包含完整回复、
+        上下文摘要和各阶段耗时的 done 事件。
+        
+        Args:
+            user_id: 用户ID
+            session_id: 会话ID
+            message: 用户消息
+            dataset_names: 知识库数据集名称列表
+            role: 角色
+        
+        Yields:
+            事件字典：{"event": "token" | "error" | "done", "data": {...}}
+        """
+        start_time = time.perf_counter()
+        retrieved = await self._retrieve_context(
+            user_id=user_id,
+            session_id=session_id,
+            message=message,
+            dataset_names=dataset_names
+        )
+        
+        with STAGE_SECONDS.time(stage="prompt_build") as prompt_timer:
+            prompt = build_conversation_prompt(
+                user_profile=retrieved["user_profile"],
+                session_memories=retrieved["session_memories"],
+                knowledge=retrieved["knowledge_results"],
+                user_message=message
+            )
+        
+        first_token_time = None
+        chunks: List[str] = []
+        saved = False
+        try:
+            with STAGE_SECONDS.time(stage="llm_generation") as llm_timer:
+                try:
+                    stream = await self.openai.chat.completions.create(
+                        **self._build_completion_kwargs(prompt, role),
+                        stream=True
+                    )
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if not delta:
+                            continue
+                        if first_token_time is None:
+                            first_token_time = time.perf_counter() - llm_timer.start
+                            STAGE_SECONDS.observe(first_token_time, stage="llm_first_token")
+                            logger.info(f"⚡ 首 token 耗时: {time.perf_counter() - start_time:.2f}秒")
+                        chunks.append(delta)
+                        yield {"event": "token", "data": {"content": delta}}
+                except Exception as e:
+                    logger.error(f"OpenAI streaming API error: {e}")
+                    SOURCE_ERRORS.inc(source="llm")
+                    if not chunks:
+                        chunks.append(FALLBACK_RESPONSE)
+                        yield {"event": "token", "data": {"content": FALLBACK_RESPONSE}}
+                    yield {"event": "error", "data": {"detail": str(e)}}
+            llm_time = llm_timer.elapsed
+            logger.info(f"⚡ LLM流式生成耗时: {llm_time:.2f}秒")
+            
+            # 完整回复已生成：先调度保存，再发送 done 事件
+            ai_response = "".join(chunks)
+            saved = True
+            await self._schedule_save(
+                user_id=user_id,
+                session_id=session_id,
+                user_message=message,
+                ai_response=ai_response,
+                dataset_names=dataset_names
+            )
+        finally:
+            if not saved and chunks:
+                # 客户端中途断开（生成器被关闭或取消）：保存已发送的部分回复，
+                # 用 shield 使保存不受本次取消影响
+                logger.warning(f"Stream closed before completion, saving partial reply for session {session_id}")
+                await asyncio.shield(asyncio.ensure_future(self._schedule_save(
+                    user_id=user_id,
+                    session_id=session_id,
+                    user_message=message,
+                    ai_response="".join(chunks),
+                    dataset_names=dataset_names
+                )))
+        
+        total_time = time.perf_counter() - start_time
+        STAGE_SECONDS.observe(total_time, stage="total")
+        retrieval_time = retrieved["retrieval_time"]
+        logger.info(f"🎯 流式对话总耗时: {total_time:.2f}秒 (检索: {retrieval_time:.2f}s + LLM: {llm_time:.2f}s)")
+        
+        yield {
+            "event": "done",
+            "data": {
+                "response": ai_response,
+                "context": self._build_context(retrieved, include_details=False),
+                "timings": self._build_timings(
+                    retrieved,
+                    prompt_build=prompt_timer.elapsed,
+                    llm_first_token=first_token_time,
+                    llm_generation=llm_time,
+                    total=total_time
+                )
+            }
+        }
+    
+    async def _retrieve_context(
+        self,
+        user_id: str,
+        session_id: str,
+        message: str,
+        dataset_names: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        并发检索用户画像、会话记忆和专业知识
+        
+        单个来源失败时降级为空结果，错误信息保留在 errors 中。
+        
+        整体截止时间（settings.retrieval_timeout）到期后取消仍未返回的来源，
+        各来源也可单独配置截止时间；超时的来源记录在 dropped_sources 中。
+        
+        Returns:
+            包含 user_profile、session_memories、knowledge_results、
+            errors、dropped_sources、retrieval_time 和各来源 timings 的字典
+        """
+        retrieval_start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        
+        # 查询向量与各来源并发计算，需要向量的来源（Mem0、本地知识索引）共享同一次调用
+        embedding_task = self._start_query_embedding(message, timings)
+        
+        async def search_memories() -> List[Dict[str, Any]]:
+            query_vector = await self._await_query_embedding(embedding_task)
+            return await self.memory_service.get_conversation_context(
                 user_id=user_id,
                 session_id=session_id,
-                query=message
-            ),
-            self.knowledge_service.search_knowledge(
                 query=message,
-                dataset_names=dataset_names or [],
-                top_k=2  # 🚀 从5减少到2，显著加快检索速度
+                query_vector=query_vector
+            )
+        
+        # 每个来源独立计时，整体预算到期后使用已返回的部分上下文
+        sources = {
+            "profile": (
+                self.profile_service.get_user_profile(user_id=user_id, max_token_size=300),  # 🚀 减少token
+                settings.profile_timeout
             ),
-            return_exceptions=True
-        )
+            "memories": (search_memories(), settings.memory_timeout),
+            "knowledge": (
+                self.knowledge_service.search_knowledge(
+                    query=message,
+                    dataset_names=dataset_names or [],
+                    top_k=2  # 🚀 从5减少到2，显著加快检索速度
+                ),
+                settings.knowledge_timeout
+            ),
+        }
+        tasks = {
+            name: asyncio.create_task(self._run_source(name, coro, timeout, timings))
+            for name, (coro, timeout) in sources.items()
+        }
+        _, pending = await asyncio.wait(tasks.values(), timeout=settings.retrieval_timeout)
+        for task in pending:
+            task.cancel()
+        if embedding_task is not None and not embedding_task.done():
+            embedding_task.cancel()
+        
+        results: Dict[str, Any] = {}
+        dropped_sources: List[str] = []
+        for name, task in tasks.items():
+            if task in pending:
+                dropped_sources.append(name)
+                results[name] = asyncio.TimeoutError(
+                    f"{name} retrieval exceeded overall deadline ({settings.retrieval_timeout}s)"
+                )
+                continue
+            if task.cancelled():
+                # 共享的进行中请求被其他调用者取消：与超时同样按跳过处理，不影响本次消息
+                dropped_sources.append(name)
+                results[name] = asyncio.TimeoutError(f"{name} retrieval was cancelled")
+                continue
+            exc = task.exception()
+            if isinstance(exc, asyncio.TimeoutError):
+                dropped_sources.append(name)
+            results[name] = exc if exc is not None else task.result()
+        
+        if dropped_sources:
+            logger.warning(f"⏱️ 检索超时，已跳过来源: {dropped_sources}")
+            for name in dropped_sources:
+                RETRIEVAL_DROPPED.inc(source=name)
+        for name, result in results.items():
+            if isinstance(result, Exception) and name not in dropped_sources:
+                SOURCE_ERRORS.inc(source=name)
         
-        retrieval_time = time.time() - retrieval_start
+        user_profile = results["profile"]
+        session_memories = results["memories"]
+        knowledge_results = results["knowledge"]
+        
+        retrieval_time = time.perf_counter() - retrieval_start
+        timings["retrieval"] = retrieval_time
+        STAGE_SECONDS.observe(retrieval_time, stage="retrieval")
         logger.info(f"⚡ 并行检索耗时: {retrieval_time:.2f}秒")
         
+        errors: Dict[str, Optional[str]] = {
+            "profile_error": None,
+            "memories_error": None,
+            "knowledge_error": None
+        }
+        
         # 处理异常并记录详细信息
         if isinstance(user_profile, Exception):
             logger.warning(f"Failed to get user profile (will use empty profile): {user_profile}")
+            errors["profile_error"] = str(user_profile)
             user_profile = {}
         else:
             logger.info(f"Retrieved user profile: {len(user_profile)} fields")
         
         if isinstance(session_memories, Exception):
             logger.warning(f"Failed to get session memories (will use empty memories): {session_memories}")
+            errors["memories_error"] = str(session_memories)
             session_memories = []
         else:
             logger.info(f"Retrieved {len(session_memories)} session memories")
@@ -90,81 +446,166 @@ class ConversationEngine:
                 logger.warning(f"Dataset not found (will continue without knowledge): {error_msg}")
             else:
                 logger.warning(f"Failed to get knowledge (will continue without knowledge): {error_msg}")
+            errors["knowledge_error"] = error_msg
             knowledge_results = []
         else:
             logger.info(f"Retrieved {len(knowledge_results)} knowledge results")
         
-        # 步骤 4：构建 Prompt
-        prompt = build_conversation_prompt(
-            user_profile=user_profile,
-            session_memories=session_memories,
-            knowledge=knowledge_results,
-            user_message=message
-        )
+        return {
+            "user_profile": user_profile,
+            "session_memories": session_memories,
+            "knowledge_results": knowledge_results,
+            "errors": errors,
+            "dropped_sources": dropped_sources,
+            "retrieval_time": retrieval_time,
+            "timings": timings
+        }
+    
+    def _start_query_embedding(
+        self,
+        message: str,
+        timings: Dict[str, float]
+    ) -> Optional[asyncio.Task]:
+        """
+        启动查询向量计算，耗时记入 timings["query_embedding"]
+        
+        只在 Mem0 按向量检索时提前启动；本地知识索引通过 EmbeddingService 的
+        single-flight 加入同一次调用，仅启用本地索引时由其按需计算（未覆盖的数据集不计算）。
+        """
+        if self.embedding_service is None or not settings.mem0_vector_search:
+            return None
+        start = time.perf_counter()
+        task = asyncio.create_task(self.embedding_service.embed_query(message))
+        
+        def on_done(done: asyncio.Task) -> None:
+            timings["query_embedding"] = time.perf_counter() - start
+            # 所有等待者都已超时取消时避免 "exception was never retrieved"
+            if not done.cancelled():
+                done.exception()
         
-        # 步骤 5：调用 OpenAI API
-        llm_start = time.time()
+        task.add_done_callback(on_done)
+        return task
+    
+    @staticmethod
+    async def _await_query_embedding(task: Optional[asyncio.Task]) -> Optional[List[float]]:
+        """
+        等待共享的查询向量；失败时返回 None，由后端回退到文本检索
+        
+        使用 shield：某个来源超时被取消时不取消其他来源仍在等待的向量计算。
+        """
+        if task is None:
+            return None
         try:
-            response = await self.openai.chat.completions.create(
-                model=settings.openai_model,
-                messages=[
-                    {"role": "system", "content": get_system_prompt(role)},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500  # 🚀 进一步限制回复长度（800→500），显著加快生成
-                # 心理咨询回复不需要太长，2-4段话即可
-            )
-            ai_response = response.choices[0].message.content
-            llm_time = time.time() - llm_start
-            logger.info(f"⚡ LLM生成耗时: {llm_time:.2f}秒")
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return None
+            raise
         except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
-            ai_response = "抱歉，我遇到了一些问题，请稍后再试。"
-            llm_time = time.time() - llm_start
+            logger.warning(f"Query embedding failed (backends fall back to text search): {e}")
+            SOURCE_ERRORS.inc(source="embedding")
+            return None
+    
+    @staticmethod
+    async def _run_source(
+        name: str,
+        coro: Awaitable[Any],
+        timeout: Optional[float],
+        timings: Dict[str, float]
+    ) -> Any:
+        """
+        执行单个检索来源：记录阶段耗时，并加上截止时间（超时抛出 asyncio.TimeoutError）
         
-        # 步骤 6-7：异步保存（不阻塞响应）
-        asyncio.create_task(
-            self._save_conversation_async(
-                user_id=user_id,
-                session_id=session_id,
-                user_message=message,
-                ai_response=ai_response,
-                dataset_names=dataset_names
-            )
-        )
+        耗时同时写入本次请求的 timings；被整体截止时间取消的来源记录截至取消时的耗时。
+        """
+        stage = SOURCE_STAGES[name]
+        with STAGE_SECONDS.time(stage=stage) as timer:
+            try:
+                if timeout is None:
+                    result = await coro
+                else:
+                    try:
+                        result = await asyncio.wait_for(coro, timeout=timeout)
+                    except asyncio.TimeoutError:
+                        raise asyncio.TimeoutError(f"retrieval exceeded source deadline ({timeout}s)")
+            finally:
+                timings[stage] = time.perf_counter() - timer.start
+        return result
+    
+    def _build_completion_kwargs(self, prompt: str, role: str) -> Dict[str, Any]:
+        """构建 chat.completions.create 的公共参数"""
+        return {
+            "model": settings.openai_model,
+            "messages": [
+                {"role": "system", "content": get_system_prompt(role)},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 500  # 🚀 进一步限制回复长度（800→500），显著加快生成
+            # 心理咨询回复不需要太长，2-4段话即可
+        }
+    
+    @staticmethod
+    def _build_timings(retrieved: Dict[str, Any], **stages: Optional[float]) -> Dict[str, float]:
+        """
+        合并检索阶段与后续阶段的耗时，得到本次请求的耗时记录（秒，保留 3 位小数）
         
-        # 总耗时
-        total_time = time.time() - start_time
-        logger.info(f"🎯 对话总耗时: {total_time:.2f}秒 (检索: {retrieval_time:.2f}s + LLM: {llm_time:.2f}s)")
+        未发生的阶段（如超时被跳过的来源、未产出 token 的首 token 耗时）不出现在结果中。
+        """
+        timings = {**retrieved["timings"], **stages}
+        return {stage: round(value, 3) for stage, value in timings.items() if value is not None}
+    
+    def _build_context(
+        self,
+        retrieved: Dict[str, Any],
+        include_details: bool = True
+    ) -> Dict[str, Any]:
+        """
+        构建返回给调用方的上下文信息
         
-        # 返回响应和上下文信息（用于测试和调试）
-        # 确保即使数据为空也返回有意义的信息
+        Args:
+            retrieved: _retrieve_context 的返回值
+            include_details: 是否包含画像、记忆和知识原文（流式摘要中省略）
+        """
+        user_profile = retrieved["user_profile"]
+        session_memories = retrieved["session_memories"]
+        knowledge_results = retrieved["knowledge_results"]
+        
+        dropped_sources = retrieved["dropped_sources"]
+        
+        # 确保即使数据为空也返回有意义的信息；超时被跳过的来源单独说明，避免误报为“暂无”
         context = {
             "user_profile": user_profile if user_profile else {},
-            "user_profile_status": "已加载" if user_profile else "暂无（首次对话或新用户）",
+            "user_profile_status": (
+                DROPPED_STATUS if "profile" in dropped_sources
+                else "已加载" if user_profile else "暂无（首次对话或新用户）"
+            ),
             "session_memories_count": len(session_memories),
-            "session_memories_status": f"已加载 {len(session_memories)} 条记忆" if session_memories else "暂无（首次对话或新会话）",
+            "session_memories_status": (
+                DROPPED_STATUS if "memories" in dropped_sources
+                else f"已加载 {len(session_memories)} 条记忆" if session_memories else "暂无（首次对话或新会话）"
+            ),
             "knowledge_count": len(knowledge_results),
-            "knowledge_status": f"已检索到 {len(knowledge_results)} 条知识" if knowledge_results else "暂无（未指定知识库或知识库为空）",
+            "knowledge_status": (
+                DROPPED_STATUS if "knowledge" in dropped_sources
+                else f"已检索到 {len(knowledge_results)} 条知识" if knowledge_results
+                else "暂无（未指定知识库或知识库为空）"
+            ),
             "session_memories": session_memories[:3] if session_memories else [],  # 🚀 减少到3条（之前5条）
             "knowledge": knowledge_results[:2] if knowledge_results else [],  # 🚀 减少到2条（之前3条）
         }
+        context["dropped_sources"] = list(dropped_sources)
+        if not include_details:
+            for key in ("user_profile", "session_memories", "knowledge"):
+                context.pop(key)
         
         # 添加调试信息（仅在有错误时）
-        if any(isinstance(x, Exception) for x in [user_profile, session_memories, knowledge_results]):
-            context["debug"] = {
-                "profile_error": str(user_profile) if isinstance(user_profile, Exception) else None,
-                "memories_error": str(session_memories) if isinstance(session_memories, Exception) else None,
-                "knowledge_error": str(knowledge_results) if isinstance(knowledge_results, Exception) else None
-            }
+        if any(retrieved["errors"].values()):
+            context["debug"] = dict(retrieved["errors"])
         
-        return {
-            "response": ai_response,
-            "context": context
-        }
+        return context
     
-    async def _save_conversation_async(
+    async def _schedule_save(
         self,
         user_id: str,
         session_id: str,
@@ -172,30 +613,95 @@ class ConversationEngine:
         ai_response: str,
         dataset_names: Optional[List[str]] = None
     ) -> None:
-        """异步保存会话记忆和更新用户画像"""
-        try:
-            await asyncio.gather(
-                self.memory_service.save_conversation(
-                    user_id=user_id,
-                    session_id=session_id,
-                    messages=[
-                        {"role": "user", "content": user_message},
-                        {"role": "assistant", "content": ai_response}
-                    ],
-                    metadata={
+        """
+        调度会话保存（不阻塞响应）
+        
+        启用 outbox 时只做本地追加，由后台投递并重试；
+        否则直接提交到后台写入队列。
+        """
+        if self.outbox:
+            messages = [
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": ai_response}
+            ]
+            try:
+                self.outbox.append("mem0.save_conversation", {
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "messages": messages,
+                    "metadata": {
                         "dataset_names": dataset_names,
                         "timestamp": datetime.now().isoformat()
                     }
-                ),
-                self.profile_service.extract_and_update_profile(
-                    user_id=user_id,
-                    messages=[
-                        {"role": "user", "content": user_message},
-                        {"role": "assistant", "content": ai_response}
-                    ]
-                ),
-                return_exceptions=True
+                })
+                self.outbox.append("memobase.update_profile", {
+                    "user_id": user_id,
+                    "messages": messages
+                })
+                return
+            except Exception as e:
+                logger.error(f"Failed to append to outbox, falling back to write queue: {e}", exc_info=True)
+        
+        await self.write_queue.submit(
+            f"save_conversation:{user_id}/{session_id}",
+            lambda: self._save_conversation_async(
+                user_id=user_id,
+                session_id=session_id,
+                user_message=user_message,
+                ai_response=ai_response,
+                dataset_names=dataset_names
             )
+        )
+    
+    async def _deliver_memory(self, payload: Dict[str, Any]) -> None:
+        """outbox 投递：保存 Mem0 会话记忆（失败抛出以便重试）"""
+        async with self.write_queue.limit("mem0"):
+            with BACKGROUND_WRITE_SECONDS.time(backend="mem0"):
+                await self.memory_service.save_conversation(**payload, raise_errors=True)
+    
+    async def _deliver_profile(self, payload: Dict[str, Any]) -> None:
+        """outbox 投递：更新 Memobase 用户画像（失败抛出以便重试）"""
+        async with self.write_queue.limit("memobase"):
+            with BACKGROUND_WRITE_SECONDS.time(backend="memobase"):
+                await self.profile_service.extract_and_update_profile(**payload, raise_errors=True)
+    
+    async def _save_conversation_async(
+        self,
+        user_id: str,
+        session_id: str,
+        user_message: str,
+        ai_response: str,
+        dataset_names: Optional[List[str]] = None
+    ) -> None:
+        """异步保存会话记忆和更新用户画像（按后端限制并发）"""
+        messages = [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": ai_response}
+        ]
+        
+        async def save_memory() -> None:
+            async with self.write_queue.limit("mem0"):
+                with BACKGROUND_WRITE_SECONDS.time(backend="mem0"):
+                    await self.memory_service.save_conversation(
+                        user_id=user_id,
+                        session_id=session_id,
+                        messages=messages,
+                        metadata={
+                            "dataset_names": dataset_names,
+                            "timestamp": datetime.now().isoformat()
+                        }
+                    )
+        
+        async def update_profile() -> None:
+            async with self.write_queue.limit("memobase"):
+                with BACKGROUND_WRITE_SECONDS.time(backend="memobase"):
+                    await self.profile_service.extract_and_update_profile(
+                        user_id=user_id,
+                        messages=messages
+                    )
+        
+        try:
+            with STAGE_SECONDS.time(stage="background_save"):
+                await asyncio.gather(save_memory(), update_profile(), return_exceptions=True)
         except Exception as e:
             logger.error(f"Failed to save conversation: {e}", exc_info=True)
-
@@ -0,0 +1,54 @@
+"""查询向量服务（每轮对话只向量化一次）"""
+import hashlib
+from typing import List, Optional
+
+from ..clients import EmbeddingClient
+from ..metrics import STAGE_SECONDS
+from .cache import TTLCache
+from .singleflight import SingleFlight
+
+
+class EmbeddingService:
+    """
+    查询向量服务
+
+    按模型与文本哈希缓存查询向量；同一轮对话中 Mem0 检索和本地知识索引
+    并发请求同一文本时通过 single-flight 合并为一次 embeddings 调用。
+    """
+
+    def __init__(self, embedder: EmbeddingClient, cache: Optional[TTLCache] = None):
+        self.embedder = embedder
+        self.cache = cache
+        self.flight = SingleFlight("embedding")
+
+    @property
+    def model(self) -> str:
+        return self.embedder.model
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\n{text}".encode("utf-8")).hexdigest()
+
+    async def embed_query(self, text: str) -> List[float]:
+        """
+        获取查询文本的向量
+
+        Args:
+            text: 查询文本
+
+        Returns:
+            查询向量
+        """
+        key = self._key(text)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        async def fetch() -> List[float]:
+            with STAGE_SECONDS.time(stage="query_embedding"):
+                vector = await self.embedder.embed_query(text)
+            if self.cache is not None:
+                self.cache.set(key, vector)
+            return vector
+
+        return await self.flight.do(key, fetch)
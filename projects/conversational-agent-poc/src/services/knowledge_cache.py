@@ -0,0 +1,214 @@
+"""知识检索结果缓存（内存 LRU + 可选 SQLite）"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS knowledge_cache (
+    key TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    versions TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dataset_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """归一化查询文本：小写、合并空白、去掉首尾标点"""
+    return " ".join(query.lower().split()).strip(" ?？!！。.,，")
+
+
+class KnowledgeCache:
+    """
+    知识检索结果缓存
+
+    键为归一化查询、数据集集合、检索方式和 top_k 的哈希。每条结果记录写入时
+    各数据集的版本号；数据集重新 cognify 后调用 bump_dataset_version，
+    旧版本的结果在读取时失效。内存层为 TTLCache，db_path 不为空时增加 SQLite 层
+    （跨进程重启保留，内存未命中时回填）。
+
+    数据集版本保存在 SQLite 中，读取时每 version_refresh 秒重新加载一次，
+    其他进程（其他 worker、数据准备脚本）递增的版本也会生效。
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 2000,
+        ttl: float = 3600.0,
+        db_path: Optional[str] = None,
+        version_refresh: float = 5.0
+    ):
+        self.ttl = ttl
+        self.version_refresh = version_refresh
+        self._versions_loaded_at = 0.0
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._versions: Dict[str, int] = {}
+        self._stats = {"disk_hits": 0, "stale": 0, "stale_writes": 0}
+        if db_path:
+            self._open()
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("DELETE FROM knowledge_cache WHERE expires_at < ?", (time.time(),))
+        self._load_versions()
+        logger.info(f"Knowledge cache opened at {self.db_path} ({len(self._versions)} dataset versions)")
+
+    def close(self) -> None:
+        """关闭 SQLite 层"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def make_key(query: str, dataset_names: List[str], search_type: str, top_k: int) -> str:
+        """缓存键"""
+        raw = json.dumps(
+            [normalize_query(query), sorted(dataset_names), search_type, top_k],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load_versions(self) -> None:
+        self._versions = dict(self._conn.execute("SELECT name, version FROM dataset_versions"))
+        self._versions_loaded_at = time.monotonic()
+
+    def current_versions(self, dataset_names: List[str], refresh: bool = False) -> Dict[str, int]:
+        """
+        数据集当前版本号
+
+        Args:
+            dataset_names: 数据集名称列表
+            refresh: 为 True 时忽略 version_refresh，立即从 SQLite 重新加载
+        """
+        if self._conn is not None and (
+            refresh or time.monotonic() - self._versions_loaded_at >= self.version_refresh
+        ):
+            self._load_versions()
+        return {name: self._versions.get(name, 0) for name in sorted(dataset_names)}
+
+    def get(
+        self,
+        query: str,
+        dataset_names: List[str],
+        search_type: str,
+        top_k: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """读取缓存结果，未命中、过期或数据集版本变化时返回 None"""
+        key = self.make_key(query, dataset_names, search_type, top_k)
+        versions = self.current_versions(dataset_names)
+
+        entry = self.memory.get(key)
+        if entry is not None:
+            if entry["versions"] == versions:
+                return entry["results"]
+            self.memory.invalidate(key)
+            self._stats["stale"] += 1
+
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT results, versions, expires_at FROM knowledge_cache WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        results, stored_versions, expires_at = json.loads(row[0]), json.loads(row[1]), row[2]
+        if expires_at < time.time() or stored_versions != versions:
+            self._conn.execute("DELETE FROM knowledge_cache WHERE key = ?", (key,))
+            self._stats["stale"] += 1
+            return None
+        self._stats["disk_hits"] += 1
+        self.memory.set(key, {"results": results, "versions": versions}, ttl=expires_at - time.time())
+        return results
+
+    def set(
+        self,
+        query: str,
+        dataset_names: List[str],
+        search_type: str,
+        top_k: int,
+        results: List[Dict[str, Any]],
+        versions: Dict[str, int]
+    ) -> bool:
+        """
+        写入缓存结果
+
+        Args:
+            versions: 检索开始前通过 current_versions 读取的数据集版本；
+                检索期间数据集被重新 cognify（版本已变化）时不写入，
+                避免旧结果记在新版本下
+
+        Returns:
+            是否写入
+        """
+        if self.current_versions(dataset_names, refresh=True) != versions:
+            self._stats["stale_writes"] += 1
+            return False
+        key = self.make_key(query, dataset_names, search_type, top_k)
+        self.memory.set(key, {"results": results, "versions": versions})
+        if self._conn is not None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO knowledge_cache (key, results, versions, expires_at) VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    json.dumps(results, ensure_ascii=False),
+                    json.dumps(versions),
+                    time.time() + self.ttl
+                )
+            )
+        return True
+
+    def bump_dataset_version(self, dataset_name: str) -> int:
+        """
+        数据集内容变化（例如重新 cognify）后递增版本号，使其相关缓存失效
+
+        Returns:
+            新版本号
+        """
+        if self._conn is not None:
+            # 在 SQLite 中原子递增，多个进程同时递增时不会得到相同的版本号
+            version = self._conn.execute(
+                "INSERT INTO dataset_versions (name, version, updated_at) VALUES (?, 1, ?) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at "
+                "RETURNING version",
+                (dataset_name, time.time())
+            ).fetchone()[0]
+        else:
+            version = self._versions.get(dataset_name, 0) + 1
+        self._versions[dataset_name] = version
+        logger.info(f"Knowledge dataset {dataset_name} bumped to version {version}")
+        return version
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存指标"""
+        disk_entries = None
+        if self._conn is not None:
+            disk_entries = self._conn.execute("SELECT COUNT(*) FROM knowledge_cache").fetchone()[0]
+        return {
+            "memory": self.memory.stats(),
+            **self._stats,
+            "disk_entries": disk_entries,
+            "db_path": self.db_path,
+            "dataset_versions": dict(self._versions),
+        }
@@ -1,13 +1,35 @@
 """知识检索服务"""
-from typing import List, Dict, Any
+import logging
+from typing import List, Dict, Any, Optional
 from ..clients import CogneeClientWrapper
+from ..config import settings
+from ..metrics import KNOWLEDGE_LOCAL_SEARCHES
+from .embedding_service import EmbeddingService
+from .knowledge_cache import KnowledgeCache
+from .singleflight import SingleFlight
+from .vector_index import LocalVectorIndex
+
+logger = logging.getLogger(__name__)
 
 
 class KnowledgeService:
     """知识检索服务"""
     
-    def __init__(self, cognee_client: CogneeClientWrapper):
+    def __init__(
+        self,
+        cognee_client: CogneeClientWrapper,
+        cache: Optional[KnowledgeCache] = None,
+        index: Optional[LocalVectorIndex] = None,
+        embedder: Optional[EmbeddingService] = None
+    ):
         self.cognee = cognee_client
+        # 静态语料的本地向量镜像：命中时不再发起远程图检索，Cognee 作为回退
+        self.index = index
+        self.embedder = embedder
+        # 知识库很少变化，而用户问题高度重叠：缓存命中可跳过整次 Cognee 检索
+        self.cache = cache
+        # 多个用户同时问同一个问题时只发起一次 Cognee 检索
+        self.flight = SingleFlight("knowledge")
     
     async def search_knowledge(
         self,
@@ -26,9 +48,82 @@ class KnowledgeService:
         Returns:
             知识检索结果列表
         """
-        return await self.cognee.search_knowledge(
-            query=query,
-            dataset_names=dataset_names,
-            top_k=top_k
-        )
-
+        search_type = f"{settings.cognee_search_strategy}:{'fanout' if settings.cognee_dataset_fanout else 'joint'}"
+        use_cache = self.cache is not None and bool(dataset_names)
+        versions: Dict[str, int] = {}
+        if use_cache:
+            cached = self.cache.get(query, dataset_names, search_type, top_k)
+            if cached is not None:
+                return cached
+            # 在检索开始前读取版本，检索期间重新 cognify 的结果不会写入缓存
+            versions = self.cache.current_versions(dataset_names)
+        
+        async def fetch() -> List[Dict[str, Any]]:
+            results = await self._search_local(query, dataset_names, top_k)
+            if results is None:
+                results = await self.cognee.search_knowledge(
+                    query=query,
+                    dataset_names=dataset_names,
+                    top_k=top_k
+                )
+            # 空结果可能来自被吞掉的错误，不缓存
+            if use_cache and results:
+                self.cache.set(query, dataset_names, search_type, top_k, results, versions)
+            return results
+        
+        # 版本变化后的请求不会合并到旧版本的在途检索上
+        key = (query, tuple(dataset_names), search_type, top_k, tuple(versions.items()))
+        return await self.flight.do(key, fetch)
+    
+    async def _search_local(
+        self,
+        query: str,
+        dataset_names: List[str],
+        top_k: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        在本地向量索引中检索（CHUNKS 语义）
+        
+        Returns:
+            检索结果；索引未覆盖这些数据集、无足够相似的片段或出错时返回 None（回退 Cognee）
+        """
+        if self.index is None or self.embedder is None or not self.index.covers(dataset_names):
+            if self.index is not None:
+                KNOWLEDGE_LOCAL_SEARCHES.inc(outcome="uncovered")
+            return None
+        if self.index.model != self.embedder.model:
+            logger.warning(
+                f"Local knowledge index was built with {self.index.model}, "
+                f"query embedder uses {self.embedder.model}; falling back to Cognee"
+            )
+            KNOWLEDGE_LOCAL_SEARCHES.inc(outcome="model_mismatch")
+            return None
+        try:
+            query_vector = await self.embedder.embed_query(query)
+            results = self.index.search(
+                query_vector,
+                dataset_names,
+                top_k=top_k,
+                min_score=settings.knowledge_index_min_score
+            )
+        except Exception as e:
+            logger.warning(f"Local knowledge search failed, falling back to Cognee: {e}")
+            KNOWLEDGE_LOCAL_SEARCHES.inc(outcome="error")
+            return None
+        if not results:
+            KNOWLEDGE_LOCAL_SEARCHES.inc(outcome="miss")
+            return None
+        KNOWLEDGE_LOCAL_SEARCHES.inc(outcome="hit")
+        logger.info(f"⚡ 本地向量索引命中 {len(results)} 条知识")
+        return results
+    
+    def invalidate_dataset(self, dataset_name: str) -> Optional[int]:
+        """
+        数据集重新 cognify 后调用，使相关缓存失效
+        
+        Returns:
+            新的数据集版本号（未启用缓存时为 None）
+        """
+        if self.cache is None:
+            return None
+        return self.cache.bump_dataset_version(dataset_name)
@@ -1,19 +1,29 @@
 """会话记忆服务"""
 from typing import List, Dict, Any, Optional
 from ..clients import Mem0ClientWrapper
+from .cache import TTLCache
+from .singleflight import SingleFlight
 
 
 class MemoryService:
     """会话记忆服务"""
     
-    def __init__(self, mem0_client: Mem0ClientWrapper):
+    def __init__(
+        self,
+        mem0_client: Mem0ClientWrapper,
+        cache: Optional[TTLCache] = None
+    ):
         self.mem0 = mem0_client
+        # 可选：缓存检索结果，保存新记忆后按用户失效
+        self.cache = cache
+        self.flight = SingleFlight("memories")
     
     async def get_conversation_context(
         self,
         user_id: str,
         session_id: str,
-        query: Optional[str] = None
+        query: Optional[str] = None,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         获取会话上下文
@@ -22,22 +32,46 @@ class MemoryService:
             user_id: 用户ID
             session_id: 会话ID
             query: 查询文本
+            query_vector: 查询向量（已计算时传入，Mem0 服务器可跳过向量化）
         
         Returns:
             记忆列表
         """
-        return await self.mem0.get_conversation_context(
-            user_id=user_id,
-            session_id=session_id,
-            query=query
-        )
+        cache_key = (user_id, session_id, query)
+        generation = 0
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            # 检索期间保存了新记忆时，旧结果不写回缓存
+            generation = self.cache.generation((user_id,))
+        
+        async def fetch() -> List[Dict[str, Any]]:
+            memories = await self.mem0.get_conversation_context(
+                user_id=user_id,
+                session_id=session_id,
+                query=query,
+                query_vector=query_vector
+            )
+            if self.cache is not None:
+                self.cache.set_if_current(cache_key, memories, (user_id,), generation)
+            return memories
+        
+        # 失效后的调用者不加入失效前发起的请求
+        return await self.flight.do((*cache_key, generation), fetch)
+    
+    def invalidate(self, user_id: str) -> None:
+        """使该用户的缓存记忆失效（跨会话结果也会受影响，因此按用户失效）"""
+        if self.cache is not None:
+            self.cache.invalidate_prefix((user_id,))
     
     async def save_conversation(
         self,
         user_id: str,
         session_id: str,
         messages: List[Dict[str, str]],
-        metadata: Dict[str, Any] = None
+        metadata: Dict[str, Any] = None,
+        raise_errors: bool = False
     ) -> None:
         """
         保存会话记忆
@@ -47,11 +81,16 @@ class MemoryService:
             session_id: 会话ID
             messages: 消息列表
             metadata: 元数据
+            raise_errors: 失败时是否抛出异常
         """
-        await self.mem0.save_conversation(
+        saved = await self.mem0.save_conversation(
             user_id=user_id,
             session_id=session_id,
             messages=messages,
-            metadata=metadata
+            metadata=metadata,
+            raise_errors=raise_errors
         )
+        # 保存失败（已记录错误）时缓存仍有效
+        if saved:
+            self.invalidate(user_id)
 
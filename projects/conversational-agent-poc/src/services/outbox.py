@@ -0,0 +1,205 @@
+"""持久化写入 outbox（SQLite WAL）"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+Dispatcher = Callable[[str, Callable[[], Awaitable[Any]]], Awaitable[bool]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class WriteOutbox:
+    """
+    基于 SQLite 的本地写入 outbox
+
+    请求路径只做一次本地追加（WAL + synchronous=NORMAL，提交时不 fsync），
+    后台轮询把到期的记录交给 dispatcher（通常是 BackgroundWriteQueue.submit）投递，
+    成功后删除，失败按指数退避重试，超过最大次数标记为 dead。
+    进程重启后未投递的记录会继续投递。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = 8,
+        base_backoff: float = 2.0,
+        max_backoff: float = 300.0,
+        poll_interval: float = 1.0,
+        batch_size: int = 50
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._conn: Optional[sqlite3.Connection] = None
+        self._handlers: Dict[str, OutboxHandler] = {}
+        self._dispatch: Optional[Dispatcher] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stats = {
+            "appended": 0,
+            "delivered": 0,
+            "retried": 0,
+            "gave_up": 0,
+        }
+
+    def register(self, kind: str, handler: OutboxHandler) -> None:
+        """注册某类记录的投递函数"""
+        self._handlers[kind] = handler
+
+    def open(self) -> None:
+        """打开数据库，并把上次未完成的 in_flight 记录恢复为 pending"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        recovered = self._conn.execute(
+            "UPDATE outbox SET status = 'pending' WHERE status = 'in_flight'"
+        ).rowcount
+        pending = self._conn.execute(
+            "SELECT COUNT(*) FROM outbox WHERE status = 'pending'"
+        ).fetchone()[0]
+        logger.info(f"Outbox opened at {self.path}: {pending} pending ({recovered} recovered)")
+
+    def close(self) -> None:
+        """关闭数据库"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def append(self, kind: str, payload: Dict[str, Any]) -> int:
+        """
+        追加一条待投递记录
+
+        Args:
+            kind: 记录类型（需已 register）
+            payload: JSON 可序列化的投递参数
+
+        Returns:
+            记录ID
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No outbox handler registered for kind: {kind}")
+        now = time.time()
+        cursor = self._conn.execute(
+            "INSERT INTO outbox (kind, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+            (kind, json.dumps(payload, ensure_ascii=False), now, now)
+        )
+        self._stats["appended"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return cursor.lastrowid
+
+    async def start(self, dispatch: Dispatcher) -> None:
+        """启动后台轮询"""
+        self._dispatch = dispatch
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._poller = asyncio.create_task(self._poll_loop(), name="outbox-poller")
+
+    async def stop(self) -> None:
+        """停止后台轮询（已派发的记录由写入队列完成投递）"""
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+
+    def stats(self) -> Dict[str, Any]:
+        """outbox 指标"""
+        counts = {"pending": 0, "in_flight": 0, "dead": 0}
+        if self._conn is not None:
+            for status, count in self._conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ):
+                counts[status] = count
+        return {**self._stats, **counts, "path": self.path}
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                for row_id, kind, payload in self._claim_due():
+                    submitted = await self._dispatch(
+                        f"outbox:{kind}#{row_id}",
+                        lambda row_id=row_id, kind=kind, payload=payload: self._deliver(row_id, kind, payload)
+                    )
+                    if not submitted:
+                        self._release(row_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox poll failed: {e}", exc_info=True)
+
+    def _claim_due(self) -> List[Tuple[int, str, Dict[str, Any]]]:
+        rows = self._conn.execute(
+            "SELECT id, kind, payload FROM outbox "
+            "WHERE status = 'pending' AND next_attempt_at <= ? "
+            "ORDER BY id LIMIT ?",
+            (time.time(), self.batch_size)
+        ).fetchall()
+        if rows:
+            self._conn.executemany(
+                "UPDATE outbox SET status = 'in_flight' WHERE id = ?",
+                [(row_id,) for row_id, _, _ in rows]
+            )
+        return [(row_id, kind, json.loads(payload)) for row_id, kind, payload in rows]
+
+    def _release(self, row_id: int) -> None:
+        self._conn.execute("UPDATE outbox SET status = 'pending' WHERE id = ?", (row_id,))
+
+    async def _deliver(self, row_id: int, kind: str, payload: Dict[str, Any]) -> None:
+        try:
+            await self._handlers[kind](payload)
+        except Exception as e:
+            self._fail(row_id, kind, e)
+            return
+        self._conn.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+        self._stats["delivered"] += 1
+
+    def _fail(self, row_id: int, kind: str, error: Exception) -> None:
+        attempts = self._conn.execute(
+            "SELECT attempts FROM outbox WHERE id = ?", (row_id,)
+        ).fetchone()[0] + 1
+        if attempts >= self.max_attempts:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                (attempts, str(error), row_id)
+            )
+            self._stats["gave_up"] += 1
+            logger.error(f"Outbox record {kind}#{row_id} gave up after {attempts} attempts: {error}")
+            return
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+        self._conn.execute(
+            "UPDATE outbox SET status = 'pending', attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+            (attempts, str(error), time.time() + delay, row_id)
+        )
+        self._stats["retried"] += 1
+        logger.warning(f"Outbox record {kind}#{row_id} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
@@ -1,13 +1,22 @@
 """用户画像服务"""
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from ..clients import MemobaseClientWrapper
+from .cache import TTLCache
+from .singleflight import SingleFlight
 
 
 class ProfileService:
     """用户画像服务"""
     
-    def __init__(self, memobase_client: MemobaseClientWrapper):
+    def __init__(
+        self,
+        memobase_client: MemobaseClientWrapper,
+        cache: Optional[TTLCache] = None
+    ):
         self.memobase = memobase_client
+        # 画像只在 flush 后变化，同一会话的多轮对话可直接复用
+        self.cache = cache
+        self.flight = SingleFlight("profile")
     
     async def get_user_profile(
         self,
@@ -24,20 +33,42 @@ class ProfileService:
         Returns:
             用户画像字典
         """
-        # Memobase 客户端是同步的，需要在异步环境中运行
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self.memobase.get_user_profile,
-            user_id,
-            max_token_size
-        )
+        cache_key = (user_id, max_token_size)
+        generation = 0
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            # 读取期间画像被更新时，旧结果不写回缓存
+            generation = self.cache.generation((user_id,))
+        
+        async def fetch() -> Dict[str, Any]:
+            # Memobase 客户端是同步的，需要在异步环境中运行
+            import asyncio
+            loop = asyncio.get_event_loop()
+            profile = await loop.run_in_executor(
+                None,
+                self.memobase.get_user_profile,
+                user_id,
+                max_token_size
+            )
+            if self.cache is not None:
+                self.cache.set_if_current(cache_key, profile, (user_id,), generation)
+            return profile
+        
+        # 失效后的调用者不加入失效前发起的请求
+        return await self.flight.do((*cache_key, generation), fetch)
+    
+    def invalidate(self, user_id: str) -> None:
+        """使该用户的缓存画像失效"""
+        if self.cache is not None:
+            self.cache.invalidate_prefix((user_id,))
     
     async def extract_and_update_profile(
         self,
         user_id: str,
-        messages: List[Dict[str, str]]
+        messages: List[Dict[str, str]],
+        raise_errors: bool = False
     ) -> None:
         """
         从对话中提取并更新用户画像
@@ -45,14 +76,19 @@ class ProfileService:
         Args:
             user_id: 用户ID
             messages: 对话消息列表
+            raise_errors: 失败时是否抛出异常
         """
         # Memobase 客户端是同步的，需要在异步环境中运行
         import asyncio
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
+        updated = await loop.run_in_executor(
             None,
             self.memobase.extract_and_update_profile,
             user_id,
-            messages
+            messages,
+            raise_errors
         )
+        # 画像已更新，下一轮对话重新获取（写入失败时缓存仍有效）
+        if updated:
+            self.invalidate(user_id)
 
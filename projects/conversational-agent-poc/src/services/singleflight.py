@@ -0,0 +1,80 @@
+"""并发相同请求合并（single-flight）"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from ..metrics import SINGLEFLIGHT_CALLS
+
+
+class _Call:
+    """一次正在进行的调用及其等待者数量"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    相同 key 的并发调用共享同一个进行中的 future
+
+    第一个调用者（leader）发起真正的请求，其余调用者（shared）等待同一结果；
+    结果或异常对所有等待者相同。某个等待者被取消（例如检索超时）不会影响其他等待者，
+    只有当所有等待者都取消时才取消底层请求。调用完成后立即移除，不做结果缓存。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"leaders": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行或加入相同 key 的调用
+
+        Args:
+            key: 请求标识（需可哈希）
+            fn: 无参协程工厂，仅 leader 会调用
+
+        Returns:
+            fn 的结果
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task, key=key, call=call: self._forget(key, call))
+            self._stats["leaders"] += 1
+            SINGLEFLIGHT_CALLS.inc(group=self.name, role="leader")
+        else:
+            self._stats["shared"] += 1
+            SINGLEFLIGHT_CALLS.inc(group=self.name, role="shared")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # 先移除再取消：取消生效（done 回调执行）前加入的调用者会发起新的调用，
+                # 而不是等待一个已取消的 future
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # 避免所有等待者都已取消时出现 "exception was never retrieved"
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """合并指标：shared 为被合并掉的调用数"""
+        total = self._stats["leaders"] + self._stats["shared"]
+        return {
+            **self._stats,
+            "in_flight": len(self._calls),
+            "dedup_rate": round(self._stats["shared"] / total, 3) if total else 0.0,
+        }
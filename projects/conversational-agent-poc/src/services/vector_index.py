@@ -0,0 +1,222 @@
+"""Cognee 知识片段的本地向量镜像（NumPy float32 矩阵，内存映射）"""
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，未安装时本地索引不可用
+    np = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_FILE = "embeddings.npy"
+TABLE_FILE = "chunks.json"
+
+# Cognee 图中保存原文片段的节点类型
+CHUNK_NODE_TYPE = "DocumentChunk"
+
+
+class LocalVectorIndex:
+    """
+    本地知识向量索引
+
+    目录结构：
+    - embeddings.npy：L2 归一化后的 float32 矩阵，按数据集连续存放，以 mmap 方式打开
+    - chunks.json：模型、维度、各数据集的 offset/count，以及每行对应的片段 id 与文本
+
+    Cognee 仍是数据源，本索引只是静态语料的只读镜像，由 sync_knowledge_index.py 重建。
+    文件被重建后，下一次查询时自动重新加载。
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._matrix = None
+        self._table: Dict[str, Any] = {}
+        self._loaded_mtime: Optional[float] = None
+        self._stats = {"queries": 0, "reloads": 0}
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    @property
+    def model(self) -> Optional[str]:
+        return self._table.get("model")
+
+    def _table_path(self) -> str:
+        return os.path.join(self.directory, TABLE_FILE)
+
+    def _maybe_reload(self) -> bool:
+        """索引文件不存在时返回 False；文件有更新时重新加载"""
+        if np is None:
+            return False
+        try:
+            mtime = os.stat(self._table_path()).st_mtime
+        except FileNotFoundError:
+            self._matrix = None
+            self._table = {}
+            self._loaded_mtime = None
+            return False
+        if mtime == self._loaded_mtime:
+            return True
+        try:
+            with open(self._table_path(), "r", encoding="utf-8") as f:
+                table = json.load(f)
+            matrix = np.load(os.path.join(self.directory, EMBEDDINGS_FILE), mmap_mode="r")
+            if matrix.shape[0] != len(table["chunks"]):
+                raise ValueError(f"{matrix.shape[0]} vectors for {len(table['chunks'])} chunks")
+        except Exception as e:
+            logger.warning(f"Failed to load local knowledge index from {self.directory}: {e}")
+            return False
+        self._matrix, self._table, self._loaded_mtime = matrix, table, mtime
+        self._stats["reloads"] += 1
+        logger.info(
+            f"📦 Loaded local knowledge index: {matrix.shape[0]} chunks, dim={matrix.shape[1]}, "
+            f"datasets={list(table['datasets'])}"
+        )
+        return True
+
+    def covers(self, dataset_names: List[str]) -> bool:
+        """索引是否包含所有指定数据集"""
+        if not dataset_names or not self._maybe_reload():
+            return False
+        return all(name in self._table["datasets"] for name in dataset_names)
+
+    def search(
+        self,
+        query_vector: List[float],
+        dataset_names: List[str],
+        top_k: int = 5,
+        min_score: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        余弦相似度 top-k（调用前应先确认 covers）
+
+        Args:
+            query_vector: 查询向量（与索引使用同一模型）
+            dataset_names: 数据集名称列表
+            top_k: 返回结果数量
+            min_score: 最低余弦相似度，低于该值的片段不返回
+
+        Returns:
+            与 Cognee CHUNKS 结果相同结构的列表：content、score、source
+        """
+        self._stats["queries"] += 1
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0 or query.shape[0] != self._matrix.shape[1]:
+            return []
+        query = query / norm
+
+        candidates: List[tuple] = []
+        for name in dataset_names:
+            span = self._table["datasets"][name]
+            offset, count = span["offset"], span["count"]
+            if count == 0:
+                continue
+            scores = self._matrix[offset:offset + count] @ query
+            k = min(top_k, count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates.extend((float(scores[i]), offset + int(i), name) for i in top)
+
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        chunks = self._table["chunks"]
+        return [
+            {"content": chunks[row]["text"], "score": round(score, 4), "source": name}
+            for score, row, name in candidates[:top_k]
+            if score >= min_score
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """索引状态"""
+        loaded = self._maybe_reload()
+        return {
+            "available": self.available,
+            "loaded": loaded,
+            "directory": self.directory,
+            "model": self.model,
+            "built_at": self._table.get("built_at"),
+            "chunks": len(self._table.get("chunks", [])),
+            "datasets": {
+                name: span["count"] for name, span in self._table.get("datasets", {}).items()
+            },
+            **self._stats,
+        }
+
+
+async def build_index(
+    cognee_client: Any,
+    embed: Callable[[List[str]], Awaitable[List[List[float]]]],
+    dataset_names: List[str],
+    directory: str,
+    model: str
+) -> Dict[str, int]:
+    """
+    从 Cognee 导出数据集的知识片段并重建本地索引
+
+    片段文本取自数据集图中的 DocumentChunk 节点，使用 embed 重新向量化
+    （查询时使用同一模型），写入临时文件后原子替换，查询端无需停机。
+
+    Args:
+        cognee_client: cognee_sdk.CogneeClient
+        embed: 批量向量化函数
+        dataset_names: 要镜像的数据集名称列表
+        directory: 索引目录
+        model: 向量模型名称（记录在索引中，查询端据此校验）
+
+    Returns:
+        各数据集导出的片段数
+    """
+    if np is None:
+        raise RuntimeError("numpy is required to build the local knowledge index")
+
+    datasets = {dataset.name: dataset.id for dataset in await cognee_client.list_datasets()}
+    missing = [name for name in dataset_names if name not in datasets]
+    if missing:
+        raise ValueError(f"Datasets not found in Cognee: {missing}")
+
+    chunks: List[Dict[str, str]] = []
+    spans: Dict[str, Dict[str, int]] = {}
+    for name in dataset_names:
+        graph = await cognee_client.get_dataset_graph(datasets[name])
+        seen = set()
+        offset = len(chunks)
+        for node in graph.nodes:
+            properties = node.properties or {}
+            if properties.get("type", node.label) != CHUNK_NODE_TYPE:
+                continue
+            text = (properties.get("text") or "").strip()
+            if not text or text in seen:
+                continue
+            seen.add(text)
+            chunks.append({"id": str(node.id), "dataset": name, "text": text})
+        spans[name] = {"offset": offset, "count": len(chunks) - offset}
+        logger.info(f"📥 Exported {spans[name]['count']} chunks from dataset {name}")
+
+    if not chunks:
+        raise ValueError(f"No {CHUNK_NODE_TYPE} nodes found in datasets {dataset_names}")
+
+    matrix = np.asarray(await embed([chunk["text"] for chunk in chunks]), dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0.0, 1.0, norms)
+
+    os.makedirs(directory, exist_ok=True)
+    embeddings_tmp = os.path.join(directory, f"{EMBEDDINGS_FILE}.tmp")
+    table_tmp = os.path.join(directory, f"{TABLE_FILE}.tmp")
+    with open(embeddings_tmp, "wb") as f:
+        np.save(f, matrix)
+    with open(table_tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "model": model,
+            "dim": int(matrix.shape[1]),
+            "built_at": time.time(),
+            "datasets": spans,
+            "chunks": chunks,
+        }, f, ensure_ascii=False)
+    # 先替换矩阵再替换索引表：查询端以 chunks.json 的 mtime 判断是否重新加载
+    os.replace(embeddings_tmp, os.path.join(directory, EMBEDDINGS_FILE))
+    os.replace(table_tmp, os.path.join(directory, TABLE_FILE))
+    return {name: span["count"] for name, span in spans.items()}
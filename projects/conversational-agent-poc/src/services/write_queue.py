@@ -0,0 +1,156 @@
+"""后台写入队列"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from ..metrics import WRITE_QUEUE_JOBS
+
+logger = logging.getLogger(__name__)
+
+WriteJob = Callable[[], Awaitable[Any]]
+
+
+class BackgroundWriteQueue:
+    """
+    有界的后台写入队列
+
+    - 固定数量的 worker 消费队列，避免每轮对话都 create_task 造成无限扇出
+    - 队列满时 submit 最多等待 put_timeout 秒（背压），超时则丢弃并计数
+    - 按后端（mem0 / memobase）限制并发写入数
+    - drain() 在关闭时等待队列中的写入完成
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        workers: int = 4,
+        backend_limits: Optional[Dict[str, int]] = None,
+        put_timeout: Optional[float] = 1.0
+    ):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._worker_count = workers
+        self._put_timeout = put_timeout
+        self._semaphores = {
+            backend: asyncio.Semaphore(limit)
+            for backend, limit in (backend_limits or {}).items()
+        }
+        self._workers: List[asyncio.Task] = []
+        self._closed = False
+        self._in_flight = 0
+        self._stats = {
+            "enqueued": 0,
+            "completed": 0,
+            "failed": 0,
+            "dropped": 0,
+        }
+        self._total_job_time = 0.0
+
+    async def start(self) -> None:
+        """启动 worker"""
+        if self._workers:
+            return
+        self._closed = False
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"write-queue-worker-{i}")
+            for i in range(self._worker_count)
+        ]
+        logger.info(f"Background write queue started with {self._worker_count} workers")
+
+    async def submit(self, name: str, job: WriteJob) -> bool:
+        """
+        提交写入任务
+
+        Args:
+            name: 任务名称（用于日志）
+            job: 无参协程工厂，由 worker 调用
+
+        Returns:
+            是否成功入队
+        """
+        if self._closed:
+            logger.warning(f"Write queue is closed, dropping job: {name}")
+            self._record("dropped")
+            return False
+        try:
+            if self._put_timeout is None:
+                await self._queue.put((name, job))
+            else:
+                await asyncio.wait_for(self._queue.put((name, job)), timeout=self._put_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ 写入队列已满（{self._queue.maxsize}），丢弃任务: {name}")
+            self._record("dropped")
+            return False
+        self._record("enqueued")
+        return True
+
+    @asynccontextmanager
+    async def limit(self, backend: str) -> AsyncIterator[None]:
+        """限制某个后端的并发写入数（未配置的后端不限制）"""
+        semaphore = self._semaphores.get(backend)
+        if semaphore is None:
+            yield
+            return
+        async with semaphore:
+            yield
+
+    async def drain(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        停止接收新任务，等待已入队的任务完成后停止 worker
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+        """
+        self._closed = True
+        pending = self._queue.qsize() + self._in_flight
+        if pending:
+            logger.info(f"Draining write queue: {pending} pending jobs")
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Write queue drain timed out after {timeout}s, "
+                f"abandoning {self._queue.qsize() + self._in_flight} jobs"
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Background write queue stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """队列指标"""
+        completed = self._stats["completed"] + self._stats["failed"]
+        return {
+            **self._stats,
+            "depth": self._queue.qsize(),
+            "maxsize": self._queue.maxsize,
+            "in_flight": self._in_flight,
+            "workers": len(self._workers),
+            "avg_job_seconds": round(self._total_job_time / completed, 3) if completed else 0.0,
+            "backend_available": {
+                backend: semaphore._value
+                for backend, semaphore in self._semaphores.items()
+            },
+        }
+
+    def _record(self, outcome: str) -> None:
+        self._stats[outcome] += 1
+        WRITE_QUEUE_JOBS.inc(outcome=outcome)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            name, job = await self._queue.get()
+            self._in_flight += 1
+            job_start = time.time()
+            try:
+                await job()
+                self._record("completed")
+            except Exception as e:
+                self._record("failed")
+                logger.error(f"Background write job failed ({name}): {e}", exc_info=True)
+            finally:
+                self._total_job_time += time.time() - job_start
+                self._in_flight -= 1
+                self._queue.task_done()
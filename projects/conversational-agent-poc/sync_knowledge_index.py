@@ -0,0 +1,60 @@
+"""同步本地知识向量索引 - 从 Cognee 导出知识片段并向量化
+
+用法：
+    python sync_knowledge_index.py kb_tech kb_psychology
+
+数据集重新 cognify 后重新运行即可；服务端在下一次查询时自动加载新索引。
+启用方式：在 .env 中设置 KNOWLEDGE_INDEX_ENABLED=true（索引与查询使用同一个 EMBEDDING_MODEL）。
+"""
+import asyncio
+import sys
+
+from cognee_sdk import CogneeClient
+from openai import AsyncOpenAI
+
+from src.clients import EmbeddingClient
+from src.config import settings
+from src.services.vector_index import build_index
+
+
+async def main():
+    dataset_names = sys.argv[1:]
+    if not dataset_names:
+        print("用法: python sync_knowledge_index.py <dataset_name> [<dataset_name> ...]")
+        sys.exit(1)
+
+    print("\n" + "="*60)
+    print("同步本地知识向量索引")
+    print("="*60)
+    print(f"Cognee: {settings.cognee_api_url}")
+    print(f"数据集: {dataset_names}")
+    print(f"向量模型: {settings.embedding_model}")
+    print(f"索引目录: {settings.knowledge_index_dir}")
+
+    openai_kwargs = {"api_key": settings.openai_api_key}
+    if settings.openai_base_url:
+        openai_kwargs["base_url"] = settings.openai_base_url
+    embedder = EmbeddingClient(AsyncOpenAI(**openai_kwargs), settings.embedding_model)
+    cognee = CogneeClient(api_url=settings.cognee_api_url, api_token=settings.cognee_api_token)
+
+    try:
+        counts = await build_index(
+            cognee,
+            embedder.embed,
+            dataset_names,
+            settings.knowledge_index_dir,
+            settings.embedding_model
+        )
+    except Exception as e:
+        print(f"\n❌ 同步失败: {e}")
+        sys.exit(1)
+    finally:
+        await cognee.close()
+
+    print("\n✅ 同步完成")
+    for name, count in counts.items():
+        print(f"  - {name}: {count} 个片段")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""测试 single-flight 请求合并（取消与加入的竞争）"""
+import asyncio
+import os
+import sys
+
+# src.services 的包导入会构建 Settings，这里不需要真实的密钥
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from src.services.singleflight import SingleFlight  # noqa: E402
+
+
+async def _join_while_cancelling():
+    """A 的截止时间到期被取消的同时，B 发起相同的检索：B 应得到结果而不是 CancelledError"""
+    flight = SingleFlight("test")
+    calls = 0
+    
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "answer"
+    
+    first = asyncio.create_task(flight.do("question", fetch))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    # 等 A 退出：底层调用已被取消，但其 done 回调尚未执行
+    while not first.done():
+        await asyncio.sleep(0)
+    second = await flight.do("question", fetch)
+    return second, calls
+
+
+async def _cancel_one_of_two_waiters():
+    """两个等待者中一个被取消时，另一个仍得到同一次调用的结果"""
+    flight = SingleFlight("test")
+    calls = 0
+    
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "answer"
+    
+    first = asyncio.create_task(flight.do("question", fetch))
+    second = asyncio.create_task(flight.do("question", fetch))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    return await second, calls
+
+
+def test_join_while_cancelling():
+    result, calls = asyncio.run(_join_while_cancelling())
+    assert result == "answer"
+    assert calls == 2
+
+
+def test_cancel_one_of_two_waiters():
+    result, calls = asyncio.run(_cancel_one_of_two_waiters())
+    assert result == "answer"
+    assert calls == 1
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("测试 single-flight 请求合并")
+    print("="*60)
+    
+    failed = False
+    for number, test in enumerate([test_join_while_cancelling, test_cancel_one_of_two_waiters], 1):
+        print(f"\n{number}. {test.__name__}...")
+        try:
+            test()
+            print("   ✅ 通过")
+        except BaseException as e:
+            print(f"   ❌ 失败: {type(e).__name__}: {e}")
+            failed = True
+    
+    sys.exit(1 if failed else 0)